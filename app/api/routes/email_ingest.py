@@ -15,7 +15,7 @@ from app.ai_providers.aliyun_llm_client import AliyunLLMClient
 from app.ai_providers.openai_llm_client import OpenAILLMClient
 from app.ai_providers.google_llm_client import GoogleLLMClient
 from app.sources.email_source_full import EmailSourceFull
-from app.utility.config import Config
+from app.utility.config import get_settings
 from app.utility.log import logger
 
 router = APIRouter()
@@ -41,19 +41,20 @@ class EmailIngestRequest(BaseModel):
 # 初始化客户端
 # ---------------------------
 def _initialize_clients(provider: Optional[str]):
+    settings = get_settings()
     embedding_client = None
     llm_client = None
     if provider:
         p = provider.lower()
         if p == "openai":
-            embedding_client = OpenAIEmbeddingClient(Config.OPENAI_API_KEY)
-            llm_client = OpenAILLMClient(Config.OPENAI_API_KEY)
+            embedding_client = OpenAIEmbeddingClient(settings.OPENAI_API_KEY)
+            llm_client = OpenAILLMClient(settings.OPENAI_API_KEY)
         elif p == "ali":
-            embedding_client = AliEmbeddingClient(Config.ALI_QWEN_API_KEY)
-            llm_client = AliyunLLMClient(Config.ALI_QWEN_API_KEY)
+            embedding_client = AliEmbeddingClient(settings.ALI_QWEN_API_KEY)
+            llm_client = AliyunLLMClient(settings.ALI_QWEN_API_KEY)
         elif p == "google":
-            embedding_client = GoogleEmbeddingClient(Config.GOOGLE_API_KEY)
-            llm_client = GoogleLLMClient(Config.GOOGLE_API_KEY)
+            embedding_client = GoogleEmbeddingClient(settings.GOOGLE_API_KEY)
+            llm_client = GoogleLLMClient(settings.GOOGLE_API_KEY)
         else:
             raise HTTPException(400, f"Unknown provider: {provider}")
     return embedding_client, llm_client
@@ -63,7 +64,8 @@ def _initialize_clients(provider: Optional[str]):
 # 构建 Pipeline Runner
 # ---------------------------
 def _make_runner(email_source: EmailSource, embedding_client=None, llm_client=None):
-    sinks = [SolrSink(Config.SOLR_URL, Config.SOLR_COLLECTION)]
+    settings = get_settings()
+    sinks = [SolrSink(settings.SOLR_URL, settings.SOLR_COLLECTION)]
     processor_classes = load_all_processor_classes()
     processors = []
     for cls in processor_classes:
@@ -73,7 +75,7 @@ def _make_runner(email_source: EmailSource, embedding_client=None, llm_client=No
         elif name == "LLMProcessor" and llm_client:
             processors.append(cls(client=llm_client))
         else:
-            processors.append(cls())
+            processors.append((getattr(cls, "get_instance", None) or cls)())
     return PipelineRunner(email_source, processors, sinks)
 
 
@@ -132,5 +134,8 @@ async def ingest_email(req: EmailIngestRequest):
     except Exception as e:
         logger.error(f"Email ingest failed: {e}")
         raise HTTPException(500, f"Email ingest failed: {e}")
+    finally:
+        # 每个请求新建的 source，用完即释放 IMAP 连接
+        await run_in_threadpool(email_source.close)
 
 
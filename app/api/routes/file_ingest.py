@@ -5,7 +5,7 @@ import json  # 导入 json 库用于解析元数据
 from app.ai_providers.aliyun_llm_client import AliyunLLMClient
 from app.ai_providers.google_llm_client import GoogleLLMClient
 from app.ai_providers.openai_llm_client import OpenAILLMClient
-from app.utility.config import Config
+from app.utility.config import get_settings
 from app.worker.tasks import ingest_file_task
 from app.orchestrator.pipeline_runner import PipelineRunner
 from app.sources.file_source import FileSource
@@ -36,6 +36,7 @@ def _make_runner(
         embedding_client: Optional[object] = None,
         llm_client: Optional[object] = None
 ):
+    settings = get_settings()
     # 1. 初始化 Source
     source = FileSource(filename, content)
 
@@ -47,7 +48,7 @@ def _make_runner(
         logger.info(f"Attached metadata to file source: {metadata}")
 
     # 3. 初始化 Sink
-    sinks = [SolrSink(Config.SOLR_URL, Config.SOLR_COLLECTION)]
+    sinks = [SolrSink(settings.SOLR_URL, settings.SOLR_COLLECTION)]
 
     # 4. 初始化 Processors
     processor_classes = load_all_processor_classes()
@@ -58,7 +59,7 @@ def _make_runner(
         elif cls.__name__ == "LLMProcessor" and llm_client is not None:
             processors.append(cls(client=llm_client))
         else:
-            processors.append(cls())
+            processors.append((getattr(cls, "get_instance", None) or cls)())
 
     runner = PipelineRunner(source, processors, sinks)
     return runner
@@ -85,6 +86,7 @@ async def upload_sync(
         )
 ):
     """同步上传 + 在线执行 pipeline（线程池执行，可并发），支持同时上传 JSON 格式元数据。"""
+    settings = get_settings()
 
     content = await file.read()
 
@@ -104,14 +106,14 @@ async def upload_sync(
     if provider:
         provider = provider.lower()
         if provider == "openai":
-            embedding_client = OpenAIEmbeddingClient(Config.OPENAI_API_KEY)
-            llm_client = OpenAILLMClient(Config.OPENAI_API_KEY)
+            embedding_client = OpenAIEmbeddingClient(settings.OPENAI_API_KEY)
+            llm_client = OpenAILLMClient(settings.OPENAI_API_KEY)
         elif provider == "ali":
-            embedding_client = AliEmbeddingClient(Config.ALI_QWEN_API_KEY)
-            llm_client = AliyunLLMClient(Config.ALI_QWEN_API_KEY)
+            embedding_client = AliEmbeddingClient(settings.ALI_QWEN_API_KEY)
+            llm_client = AliyunLLMClient(settings.ALI_QWEN_API_KEY)
         elif provider == "google":
-            embedding_client = GoogleEmbeddingClient(Config.GOOGLE_API_KEY)
-            llm_client = GoogleLLMClient(Config.GOOGLE_API_KEY)
+            embedding_client = GoogleEmbeddingClient(settings.GOOGLE_API_KEY)
+            llm_client = GoogleLLMClient(settings.GOOGLE_API_KEY)
         else:
             raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
 
@@ -10,7 +10,7 @@ from app.ai_providers.aliyun_llm_client import AliyunLLMClient
 from app.ai_providers.google_llm_client import GoogleLLMClient
 from app.ai_providers.openai_llm_client import OpenAILLMClient
 from app.sources.web_crawler_source import WebCrawlerSource
-from app.utility.config import Config
+from app.utility.config import get_settings
 from app.orchestrator.pipeline_runner import PipelineRunner
 from app.sources.file_source import FileSource
 from app.sources.text_source import TextSource
@@ -117,6 +117,7 @@ def _make_runner(
         source_system: Optional[str] = None # <-- ADDED
 ):
     """根据不同 source_type 生成不同 Source 对象并配置 PipelineRunner"""
+    settings = get_settings()
 
     logger.info(f"Starting pipeline runner for source_type='{source_type}' and filename='{filename}'")
 
@@ -138,10 +139,14 @@ def _make_runner(
             raise HTTPException(400, detail="source_type='web' requires a valid 'uri' field")
         max_depth = metadata.get("max_depth", 2) if metadata else 2
         allowed_exts = metadata.get("allowed_extensions") if metadata else None
+        favor_precision = metadata.get("favor_precision") if metadata else None
         source = WebCrawlerSource(
             start_url=content,
             max_depth=max_depth,
-            allowed_extensions=allowed_exts
+            allowed_extensions=allowed_exts,
+            favor_precision=bool(settings.WEB_CRAWLER_FAVOR_PRECISION if favor_precision is None else favor_precision),
+            incremental=bool(metadata.get("incremental")) if metadata else False,
+            redis_url=settings.REDIS_BACKEND_URL or settings.REDIS_BROKER_URL,
         )
     else:
         # 这个分支理论上不应该在 API 层面触发，因为已被验证
@@ -161,7 +166,7 @@ def _make_runner(
 
 
     # 3. Sink
-    sinks = [SolrSink(Config.SOLR_URL, Config.SOLR_COLLECTION)]
+    sinks = [SolrSink(settings.SOLR_URL, settings.SOLR_COLLECTION)]
 
     # 4. Processors
     processor_classes = load_all_processor_classes()
@@ -176,7 +181,7 @@ def _make_runner(
         elif processor_name == "LLMProcessor" and llm_client:
             processors.append(cls(client=llm_client))
         else:
-            processors.append(cls())
+            processors.append((getattr(cls, "get_instance", None) or cls)())
 
     return PipelineRunner(source, processors, sinks)
 
@@ -186,20 +191,21 @@ def _make_runner(
 # -------------------------------------------------
 def _initialize_clients(provider: Optional[str]):
     """根据 provider 初始化 LLM 和 Embedding 客户端"""
+    settings = get_settings()
     embedding_client = None
     llm_client = None
 
     if provider:
         p = provider.lower()
         if p == "openai":
-            embedding_client = OpenAIEmbeddingClient(Config.OPENAI_API_KEY)
-            llm_client = OpenAILLMClient(Config.OPENAI_API_KEY)
+            embedding_client = OpenAIEmbeddingClient(settings.OPENAI_API_KEY)
+            llm_client = OpenAILLMClient(settings.OPENAI_API_KEY)
         elif p == "ali":
-            embedding_client = AliEmbeddingClient(Config.ALI_QWEN_API_KEY)
-            llm_client = AliyunLLMClient(Config.ALI_QWEN_API_KEY)
+            embedding_client = AliEmbeddingClient(settings.ALI_QWEN_API_KEY)
+            llm_client = AliyunLLMClient(settings.ALI_QWEN_API_KEY)
         elif p == "google":
-            embedding_client = GoogleEmbeddingClient(Config.GOOGLE_API_KEY)
-            llm_client = GoogleLLMClient(Config.GOOGLE_API_KEY)
+            embedding_client = GoogleEmbeddingClient(settings.GOOGLE_API_KEY)
+            llm_client = GoogleLLMClient(settings.GOOGLE_API_KEY)
         else:
             raise HTTPException(400, f"Unknown provider: {provider}")
 
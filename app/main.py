@@ -5,7 +5,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 # 假设这些模块导入路径正确，并且 Config 包含所有配置
 from app.utility.log import logger
-from app.utility.config import Config
+from app.utility.config import get_settings
 from app.api.router import router
 
 # ----------------------------------------------------
@@ -23,11 +23,12 @@ async def lifespan(app: FastAPI):
     FastAPI 应用生命周期管理器 (推荐的现代做法)。
     负责在应用启动前后的资源初始化和清理。
     """
+    settings = get_settings()
 
     # --- 启动事件 (Startup) ---
     logger.info("========================================")
-    logger.info(f"🚀 Starting {Config.APP_NAME} (v{Config.VERSION})")
-    logger.info(f"✅ Debug mode: {Config.DEBUG}")
+    logger.info(f"🚀 Starting {settings.APP_NAME} (v{settings.VERSION})")
+    logger.info(f"✅ Debug mode: {settings.DEBUG}")
     logger.info(f"✅ Log Level: {logging.getLevelName(logger.level)}")
     logger.info("========================================")
 
@@ -36,7 +37,7 @@ async def lifespan(app: FastAPI):
     yield  # <-- 应用运行阶段
 
     # --- 关闭事件 (Shutdown) ---
-    logger.info(f"👋 Shutting down {Config.APP_NAME}...")
+    logger.info(f"👋 Shutting down {settings.APP_NAME}...")
     # 在这里执行清理操作，例如：
     # - 关闭数据库连接池
     # - 停止后台线程或任务
@@ -48,12 +49,12 @@ async def lifespan(app: FastAPI):
 # ----------------------------------------------------
 # 移除冗余的 app2 命名，直接使用 app
 app = FastAPI(
-    title=Config.APP_NAME,
-    version=Config.VERSION,
-    debug=Config.DEBUG,
+    title=get_settings().APP_NAME,
+    version=get_settings().VERSION,
+    debug=get_settings().DEBUG,
     lifespan=lifespan,  # 正确传入 lifespan
     # 可以在这里添加 openapi_url=None 来禁用 OpenAPI 文档，如果不需要的话
-    # openapi_url="/openapi.json" if Config.DEBUG else None
+    # openapi_url="/openapi.json" if get_settings().DEBUG else None
 )
 
 # ----------------------------------------------------
@@ -61,8 +62,8 @@ app = FastAPI(
 # ----------------------------------------------------
 app.add_middleware(
     CORSMiddleware,
-    # 使用 * 号来提高可读性，但如果 Config.ALLOWED_ORIGINS 包含具体的 URL 列表，则直接使用列表
-    allow_origins=Config.ALLOWED_ORIGINS,
+    # 使用 * 号来提高可读性，但如果 get_settings().ALLOWED_ORIGINS 包含具体的 URL 列表，则直接使用列表
+    allow_origins=get_settings().ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -81,8 +82,9 @@ app.include_router(router)
 @app.get("/", summary="Root Health Check")
 async def root():
     """提供应用的基本信息和健康状态。"""
+    settings = get_settings()
     return {
-        "app_name": Config.APP_NAME,
-        "version": Config.VERSION,
+        "app_name": settings.APP_NAME,
+        "version": settings.VERSION,
         "status": "online"
     }
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import Dict, Any, List, Optional
 from app.pipelines.base import BaseProcessor
 from app.sources.base import BaseSource
 from app.sinks.base import BaseSink
+from app.utility.utils import remove_spilled
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
@@ -28,7 +29,14 @@ class PipelineRunner:
     def run_single(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None):
         """
         处理单个文件（dict），按 processors 顺序处理，并写入 sinks
+        Source 落盘的临时文件（binary_path）无论成功与否都在此处理结束后删除
         """
+        try:
+            return self._run_single(data, context)
+        finally:
+            remove_spilled(data.get("binary_path"))
+
+    def _run_single(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None):
         context = context or {}
         # 顺序处理 processors
         for processor in self.processors:
@@ -56,6 +64,33 @@ class PipelineRunner:
 
     def run(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         context = context or {}
+        # 批量 sink（如 Solr）在 pipeline 结束时统一 flush + commit 一次
+        try:
+            result = self._run(context)
+        except Exception:
+            self._flush_sinks()
+            raise
+        errors = self._flush_sinks()
+        if errors:
+            # 各文件的 doc 可能仍在 sink 缓冲区中未写出：flush 失败时本批所有文件都不能算成功
+            for summary in result["files"]:
+                if summary.get("status") != "failed":
+                    summary["status"] = "failed"
+                    summary["error"] = f"Sink flush failed: {errors[0]}"
+            result["status"] = "failed"
+        return result
+
+    def _flush_sinks(self) -> List[Exception]:
+        errors = []
+        for sink in self.sinks:
+            try:
+                sink.flush(commit=True)
+            except Exception as e:
+                logger.error(f"[PipelineRunner] Sink {sink.__class__.__name__} flush failed: {e}")
+                errors.append(e)
+        return errors
+
+    def _run(self, context: Dict[str, Any]) -> Dict[str, Any]:
 
         # 1) Source read
         data_or_list = self.source.read(context=context)
@@ -3,7 +3,7 @@ from app.ai_providers.google_client import GoogleEmbeddingClient
 from app.ai_providers.openai_client import OpenAIEmbeddingClient
 from app.pipelines.base import BaseProcessor
 from typing import Dict, Any, Optional
-from app.utility.config import Config
+from app.utility.config import get_settings
 
 class EmbedProcessor(BaseProcessor):
     """
@@ -23,11 +23,11 @@ class EmbedProcessor(BaseProcessor):
         elif client is not None:
             # 根据 client 类型选择默认模型
             if isinstance(client, OpenAIEmbeddingClient):
-                self.model = Config.OPENAI_EMBEDDING_MODEL
+                self.model = get_settings().OPENAI_EMBEDDING_MODEL
             elif isinstance(client, AliEmbeddingClient):
-                self.model = Config.ALI_EMBEDDING_MODEL
+                self.model = get_settings().ALI_EMBEDDING_MODEL
             elif isinstance(client, GoogleEmbeddingClient):
-                self.model = Config.GOOGLE_EMBEDDING_MODEL
+                self.model = get_settings().GOOGLE_EMBEDDING_MODEL
             else: self.model = None
         else:
             self.model = None
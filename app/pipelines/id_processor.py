@@ -4,6 +4,7 @@ import hashlib
 from typing import Dict, Any, Optional, Union
 from app.pipelines.base import BaseProcessor  # 假设 BaseProcessor 位于 app.pipelines.base
 from app.utility.log import logger
+from app.utility.utils import read_spilled_binary
 
 
 # -------------------------------------------------
@@ -24,7 +25,7 @@ def clean_filename_keep_chinese(text: str) -> str:
 # 核心函数：稳定 Doc ID 生成器
 # -------------------------------------------------
 def generate_stable_doc_id(
-        content_for_hash: Union[bytes, str],
+        content_for_hash: Union[bytes, bytearray, str],
         file_name: str,
         preferred_doc_id: Optional[str] = None,
         source_system: str | None = None,
@@ -50,7 +51,7 @@ def generate_stable_doc_id(
     # 统一将内容转换为 bytes 进行哈希
     if isinstance(content_for_hash, str):
         content_bytes = content_for_hash.encode("utf-8")
-    elif isinstance(content_for_hash, bytes):
+    elif isinstance(content_for_hash, (bytes, bytearray)):
         content_bytes = content_for_hash
     else:
         # Fallback for unexpected type
@@ -98,11 +99,6 @@ class IdProcessor(BaseProcessor):
 
         file_name = data.get("file_name", "unknown_source")
 
-        if not content_for_hash:
-            logger.error("IdProcessor failed: No content for hash calculation (binary, raw_text, or uri)")
-            # 即使失败也尝试继续，可能上游有 preferred_doc_id
-            content_for_hash = "no_content"
-
         # 2. 获取优先 ID (Preferred ID)
         user_metadata = data.get("user_metadata", {})
 
@@ -114,6 +110,16 @@ class IdProcessor(BaseProcessor):
                 or data.get("id")
         )
 
+        # 内容已落盘（binary_path）：只有在没有优先 ID、确实需要内容哈希时才读盘
+        if not content_for_hash and not preferred_id and data.get("binary_path"):
+            content_for_hash = read_spilled_binary(data["binary_path"])
+
+        if not content_for_hash and not preferred_id:
+            logger.error("IdProcessor failed: No content for hash calculation (binary, raw_text, or uri)")
+        if not content_for_hash:
+            # 即使失败也尝试继续，可能上游有 preferred_doc_id
+            content_for_hash = "no_content"
+
         # 3. 生成 ID
         api_source_system = user_metadata.get("source_system")
 
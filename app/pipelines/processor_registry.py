@@ -46,7 +46,9 @@ def load_all_processors() -> List[BaseProcessor]:
     instances = []
     for cls in classes:
         try:
-            inst = cls()
+            # 提供 get_instance() 的处理器（如 TikaProcessor）复用进程级共享实例
+            factory = getattr(cls, "get_instance", None) or cls
+            inst = factory()
             instances.append(inst)
         except Exception as e:
             logger.warning(f"实例化失败 {cls.__name__}: {e}")
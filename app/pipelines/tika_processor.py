@@ -1,22 +1,241 @@
 import os
+import re
+import asyncio
+import codecs
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
+import aiohttp
+import orjson
 import requests
 from app.pipelines.base import BaseProcessor
 from app.utility.log import logger
-from app.utility.config import Config
+from app.utility.config import get_settings
+from app.utility.utils import build_http_session, read_spilled_binary
+
+# 日期解析：YYYY-MM-DD[(T| )HH:MM:SS]，替代逐个格式尝试 strptime
+_DATE_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ](\d{1,2}):(\d{1,2}):(\d{1,2}))?")
+
+# 扫描仪 / 扫描软件 Producer 关键字，合并为单个正则一次匹配
+_SCAN_RE = re.compile(r"scan|image|mfp|scanner|canon|fujitsu|kodak|hp|ricoh|epson|pdfscan", re.I)
+
+_LEADING_WS_RE = re.compile(r"\s*")
+_TAIL_SCAN_CHUNK = 4096
+
+
+def _stripped_len_at_least(text: str, n: int) -> bool:
+    """等价于 len(text.strip()) >= n，但只扫描首尾空白，不复制整段文本。"""
+    if len(text) < n:
+        return False
+    start = _LEADING_WS_RE.match(text).end()
+    # 尾部空白按块用 rstrip（C 实现）扫描：扫描版 PDF 的输出常以大段空行 / 换页符结尾，
+    # 每次只复制一个有界的尾部切片，而不是逐字符的 Python 循环
+    end = len(text)
+    while end > start:
+        chunk = text[max(start, end - _TAIL_SCAN_CHUNK):end]
+        stripped = len(chunk.rstrip())
+        end -= len(chunk) - stripped
+        if stripped:
+            break
+    return end - start >= n
 
 
 class TikaProcessor(BaseProcessor):
     """终极生产级 Tika 解析器（2025 大厂标配版）。ID 生成逻辑已移至 IdProcessor。"""
     order = 10
-    TIKA_SERVER = Config.TIKA_SERVICE_URL
-    TIMEOUT = Config.TIKA_SERVICE_TIMEOUT
+    # 固定 header 在类定义时构建一次；请求地址在 __init__ 中按配置构建一次，避免每个文档重复拼接
+    _TEXT_HDR = {"Accept": "text/plain"}
+    _JSON_HDR = {"Accept": "application/json"}
+
+    # 进程内共享的连接池，/tika 与 /meta 请求复用 Keep-Alive 连接
+    _session = build_http_session(pool_connections=4, pool_maxsize=32)
+
+    # 逻辑字段 -> Tika 原始 metadata 候选 key（按优先级）
+    _FIELD_ALIASES = {
+        "title": ("dc:title", "title", "pdf:docinfo:title", "subject"),
+        "author": ("dc:creator", "meta:author", "creator", "Author", "pdf:Author", "pdf:docinfo:creator"),
+        "created_at": ("dcterms:created", "meta:creation-date", "Creation-Date", "date"),
+        "modified_at": ("dcterms:modified", "Last-Modified", "meta:save-date"),
+        "language": ("language", "dc:language", "Content-Language"),
+        "page_count": ("xmpTPg:NPages", "pdf:NPages", "Page-Count", "NumberOfPages"),
+        "keywords": ("keywords", "meta:keyword", "binary:Keywords"),
+        "company": ("Company", "dc:publisher"),
+        "category": ("Category",),
+    }
+
+    _instance: Optional["TikaProcessor"] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "TikaProcessor":
+        """
+        进程级共享实例。process() 不修改实例状态，可被多个线程 / pipeline 安全复用，
+        避免每次构建 runner 都重新创建线程池。
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, io_workers: int = 4):
+        """
+        :param io_workers: 并发发送 /meta 请求的线程数。
+            /tika 在调用线程内执行，/meta 提交到线程池，两者同时在 Tika Server 上解析。
+        """
+        # 导入模块时不读取配置，首次创建实例时才构建 Settings
+        settings = get_settings()
+        self.TIKA_SERVER = settings.TIKA_SERVICE_URL
+        self.TIMEOUT = settings.TIKA_SERVICE_TIMEOUT
+        self._TIKA_URL = f"{self.TIKA_SERVER}/tika"
+        self._META_URL = f"{self.TIKA_SERVER}/meta"
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="tika-io")
 
     def process(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        job = self._prepare(data)
+        if "result" in job:
+            return job["result"]
+
+        binary = job["binary"]
+        file_name = job["file_name"]
+        # File-Name header 每个文档只构建一次，/tika 与 /meta 共用；
+        # 纯 ASCII 文件名直接用 str，非 ASCII 以 UTF-8 原始字节发送（Tika Server 按此解析）
+        file_name_header = file_name if file_name.isascii() else file_name.encode("utf-8")
+
+        try:
+            # ==================== 提取完整 Metadata（后台并发） ====================
+            # /tika 与 /meta 互不依赖，/meta 提交到线程池，与下面的 /tika 同时进行
+            meta_future = self._io_pool.submit(
+                self._session.put,
+                self._META_URL,
+                data=binary,
+                headers={**self._JSON_HDR, "File-Name": file_name_header},
+                timeout=self.TIMEOUT,
+            )
+
+            # ==================== 提取纯文本 ====================
+            # 以流式读取响应：按 64KB 块增量解码（Tika 输出固定为 UTF-8），不经过 requests 的编码探测，
+            # 也不会在得到文本的同时再持有一份完整的响应字节
+            with self._session.put(
+                self._TIKA_URL,
+                data=binary,
+                headers={**self._TEXT_HDR, "File-Name": file_name_header},
+                timeout=self.TIMEOUT,
+                stream=True,
+            ) as tika_resp:
+                # 离开 with 后连接即关闭，错误详情必须在此读出
+                self._raise_for_status(tika_resp, "/tika")
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                parts = [decoder.decode(chunk) for chunk in tika_resp.iter_content(65536)]
+                parts.append(decoder.decode(b"", final=True))
+                raw_text = "".join(parts)
+
+            meta_resp = meta_future.result()
+            self._raise_for_status(meta_resp, "/meta")
+            raw_meta = orjson.loads(meta_resp.content)
+
+            return self._finish(job, raw_text, raw_meta, context)
+
+        except requests.RequestException as e:
+            # HTTP 错误的状态码与响应内容已包含在异常信息中（见 _raise_for_status）
+            logger.error(f"Tika Server 错误 ({file_name}): {e}")
+            raise
+        except Exception as e:
+            logger.error(f"TikaProcessor 未知错误 ({file_name}): {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def _raise_for_status(resp: requests.Response, endpoint: str) -> None:
+        """非 2xx 时读出响应体（截取前 500 字节）并随异常抛出，日志中可以看到 Tika 返回的错误详情"""
+        if not resp.ok:
+            err_body = resp.content[:500].decode("utf-8", errors="replace")
+            raise requests.HTTPError(f"Tika {endpoint} 返回 {resp.status_code}: {err_body}", response=resp)
+
+    # ============================== 批量异步解析 ==============================
+    async def process_batch(
+            self,
+            items: List[Dict[str, Any]],
+            context: Optional[Dict[str, Any]] = None,
+            concurrency: int = 16,
+    ) -> List[Any]:
+        """
+        批量异步解析：最多 concurrency 个文档同时在 Tika Server 上解析，
+        每个文档的 /tika 与 /meta 也并发发出。
+        返回与 items 顺序一致的结果列表；单个文档失败时对应位置为异常对象，不影响其他文档。
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        # 每个文档同时占用 /tika 与 /meta 两个连接
+        async with self._aio_session(concurrency * 2) as session:
+            async def one(data: Dict[str, Any]) -> Dict[str, Any]:
+                job = self._prepare(data)
+                if "result" in job:
+                    return job["result"]
+
+                binary = job["binary"]
+                # aiohttp 以 UTF-8 序列化 header，直接传 str 即与同步路径发送的字节一致
+                name_hdr = {"File-Name": job["file_name"]}
+                try:
+                    async with sem:
+                        text_body, meta_body = await asyncio.gather(
+                            self._aput(session, self._TIKA_URL, binary, {**self._TEXT_HDR, **name_hdr}),
+                            self._aput(session, self._META_URL, binary, {**self._JSON_HDR, **name_hdr}),
+                        )
+                    raw_text = text_body.decode("utf-8", errors="replace")
+                    return self._finish(job, raw_text, orjson.loads(meta_body), context)
+                except Exception as e:
+                    logger.error(f"TikaProcessor 批量解析失败 ({job['file_name']}): {e}")
+                    raise
+
+            return await asyncio.gather(*(one(d) for d in items), return_exceptions=True)
+
+    async def process_many(self, binaries: List[bytes], concurrency: int = 16) -> List[Any]:
+        """
+        仅提取纯文本（/tika）的批量接口：多个文件通过同一个连接池并发发往 Tika Server。
+        返回与 binaries 顺序一致的文本列表；单个文件失败时对应位置为异常对象。
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async with self._aio_session(concurrency) as session:
+            async def one(binary: bytes) -> str:
+                async with sem:
+                    body = await self._aput(session, self._TIKA_URL, binary, self._TEXT_HDR)
+                return body.decode("utf-8", errors="replace")
+
+            return await asyncio.gather(*(one(b) for b in binaries), return_exceptions=True)
+
+    def extract_texts(self, binaries: List[bytes], concurrency: int = 16) -> List[Any]:
+        """process_many 的同步入口，供不在事件循环中的调用方使用。"""
+        return asyncio.run(self.process_many(binaries, concurrency=concurrency))
+
+    def _aio_session(self, limit: int) -> aiohttp.ClientSession:
+        """
+        批量接口使用的 aiohttp 会话：连接数上限 limit，空闲连接保活 60 秒。
+        会话与事件循环绑定，因此每次批量调用内创建，批内所有请求共享连接。
+        """
+        connector = aiohttp.TCPConnector(limit=limit, keepalive_timeout=60)
+        return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.TIMEOUT))
+
+    @staticmethod
+    async def _aput(session: aiohttp.ClientSession, url: str, binary: bytes, headers: Dict[str, str]) -> bytes:
+        async with session.put(url, data=binary, headers=headers) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+    # ============================== 请求准备 / 结果组装 ==============================
+    def _prepare(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        解析 data 中与 Tika 调用相关的字段。
+        Web 预抓取文本或无 binary 时无需调用 Tika，直接在返回值的 "result" 中给出结果。
+        """
         binary = data.get("binary")
+        # 邮件附件等由 Source 落盘、只携带 binary_path；上传 Tika 前才读入
+        # 临时文件由 PipelineRunner 在该条目处理结束后删除（失败重试时仍可读取）
+        if not binary and data.get("binary_path"):
+            binary = read_spilled_binary(data["binary_path"])
         stable_doc_id = data.get("doc_id")
         file_name = data.get("file_name", "unknown_file")
         file_ext = os.path.splitext(file_name)[1].lstrip('.').lower() or "unknown"
@@ -24,6 +243,9 @@ class TikaProcessor(BaseProcessor):
         # 获取上游（Source）传入的用户自定义元数据
         user_metadata = data.get("user_metadata", {})
 
+        # 调用方已显式传入 doc_id 时，可跳过 content_md5 / content_sha256 的计算
+        skip_content_hashes = bool(data.get("skip_content_hashes", False)) and bool(user_metadata.get("doc_id"))
+
         # NEW: 提取用户指定的 ingestion_method
         # 优先级：user_metadata > data.ingestion_method > data.type (Source 提供的) > 默认值
         ingestion_method = (
@@ -33,6 +255,16 @@ class TikaProcessor(BaseProcessor):
             or "file_upload"  # 默认值
         )
 
+        job = {
+            "binary": binary,
+            "doc_id": stable_doc_id,
+            "file_name": file_name,
+            "file_ext": file_ext,
+            "user_metadata": user_metadata,
+            "ingestion_method": ingestion_method,
+            "skip_content_hashes": skip_content_hashes,
+        }
+
         # ============================ 特殊处理 Web 文本 ============================
         if data.get("source_type") == "web" and "raw_text" in data and data["raw_text"]:
             logger.info(f"TikaProcessor: using pre-fetched raw_text for web source {file_name}")
@@ -45,7 +277,8 @@ class TikaProcessor(BaseProcessor):
             merged_metadata["source_name"] = file_name
             merged_metadata["source_type"] = file_ext
             merged_metadata["raw_text_length"] = len(raw_text)
-            return {"raw_text": raw_text, "metadata": merged_metadata}
+            job["result"] = {"raw_text": raw_text, "metadata": merged_metadata}
+            return job
 
         # ============================ 无 binary 情况 ============================
         if not binary:
@@ -56,75 +289,59 @@ class TikaProcessor(BaseProcessor):
                 "ingestion_method": ingestion_method,
                 **user_metadata  # <-- 核心修复：合并所有用户传入的元数据
             }
-            return {"raw_text": data.get("raw_text"), "metadata": merged_metadata}
+            job["result"] = {"raw_text": data.get("raw_text"), "metadata": merged_metadata}
+            return job
 
         if not stable_doc_id:
             logger.error("TikaProcessor failed: doc_id not found in data. IdProcessor may have been skipped.")
             # 强行设置一个 fallback ID 以避免崩溃，但这是错误情况
-            stable_doc_id = "error_fallback_" + hashlib.sha256(binary).hexdigest()[:10]
+            job["doc_id"] = "error_fallback_" + hashlib.sha256(binary).hexdigest()[:10]
 
-        try:
-            # ==================== 提取纯文本 ====================
-            tika_resp = requests.put(
-                f"{self.TIKA_SERVER}/tika",
-                data=binary,
-                headers={
-                    "Accept": "text/plain",
-                    "File-Name": file_name.encode("utf-8"),
-                },
-                timeout=self.TIMEOUT,
-            )
-            tika_resp.raise_for_status()
-            if tika_resp.encoding is None or tika_resp.encoding.lower() != "utf-8":
-                tika_resp.encoding = "utf-8"
-            raw_text = tika_resp.text
-
-            # ==================== 提取完整 Metadata ====================
-            meta_resp = requests.put(
-                f"{self.TIKA_SERVER}/meta",
-                data=binary,
-                headers={
-                    "Accept": "application/json",
-                    "File-Name": file_name.encode("utf-8"),
-                },
-                timeout=self.TIMEOUT,
-            )
-            meta_resp.raise_for_status()
-            raw_meta = meta_resp.json()
-
-            # ==================== 终极归一化 + 增强 ====================
-            metadata = self._normalize_and_enhance_metadata(
-                raw_meta=raw_meta,
-                file_name=file_name,
-                file_ext=file_ext,
-                raw_text=raw_text,
-                binary=binary,
-                doc_id=stable_doc_id,  # 使用 IdProcessor 传入的 ID
-                user_metadata=user_metadata,
-                ingestion_method=ingestion_method,  # NEW: 传入上传方式
-            )
+        return job
 
-            logger.info(
-                f"TikaProcessor 成功 | doc_id: {stable_doc_id} | "
-                f"文件: {file_name} | 长度: {len(raw_text)} | "
-                f"页数: {metadata.get('page_count', 'N/A')} | "
-                f"标题: {metadata.get('title', '无标题')[:60]} | "
-                f"上传方式: {ingestion_method}"  # NEW: Log中显示上传方式
-            )
+    def _finish(
+            self,
+            job: Dict[str, Any],
+            raw_text: str,
+            raw_meta: Any,
+            context: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """根据 Tika 返回的文本与原始 metadata 组装处理结果。"""
+        if isinstance(raw_meta, list):  # /rmeta 返回列表，取容器文档本身
+            raw_meta = raw_meta[0] if raw_meta else {}
+
+        binary = job["binary"]
+        stable_doc_id = job["doc_id"]
+        file_name = job["file_name"]
+        ingestion_method = job["ingestion_method"]
+
+        digests = None if job["skip_content_hashes"] else self._content_digests(binary)
+
+        # ==================== 终极归一化 + 增强 ====================
+        metadata = self._normalize_and_enhance_metadata(
+            raw_meta=raw_meta,
+            file_name=file_name,
+            file_ext=job["file_ext"],
+            raw_text=raw_text,
+            binary=binary,
+            doc_id=stable_doc_id,  # 使用 IdProcessor 传入的 ID
+            user_metadata=job["user_metadata"],
+            ingestion_method=ingestion_method,  # NEW: 传入上传方式
+            digests=digests,
+        )
 
-            return {
-                "raw_text": raw_text,
-                "metadata": metadata,
-            }
+        logger.info(
+            f"TikaProcessor 成功 | doc_id: {stable_doc_id} | "
+            f"文件: {file_name} | 长度: {len(raw_text)} | "
+            f"页数: {metadata.get('page_count', 'N/A')} | "
+            f"标题: {metadata.get('title', '无标题')[:60]} | "
+            f"上传方式: {ingestion_method}"  # NEW: Log中显示上传方式
+        )
 
-        except requests.RequestException as e:
-            logger.error(f"Tika Server 错误 ({file_name}): {e}")
-            if hasattr(e, "response") and e.response is not None:
-                logger.error(f"状态码: {e.response.status_code} | 内容: {e.response.text[:500]}")
-            raise
-        except Exception as e:
-            logger.error(f"TikaProcessor 未知错误 ({file_name}): {e}", exc_info=True)
-            raise
+        return {
+            "raw_text": raw_text,
+            "metadata": metadata,
+        }
 
     # ============================== 终极元数据处理 ==============================
     def _normalize_and_enhance_metadata(
@@ -137,27 +354,19 @@ class TikaProcessor(BaseProcessor):
             doc_id: str,
             user_metadata: Dict[str, Any],
             ingestion_method: str,  # NEW: 接收上传方式
+            digests: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
 
-        # Helper: 优先获取存在的 key
-        def get(*keys, default=""):
-            for k in keys:
+        # 一次性解析所有逻辑字段：每个字段取第一个存在的 key，列表取首个元素
+        resolved = {}
+        for field, aliases in self._FIELD_ALIASES.items():
+            v = ""
+            for k in aliases:
                 v = raw_meta.get(k)
                 if v is not None:
-                    # 确保处理列表类型的值
-                    return v[0] if isinstance(v, list) else v
-            return default
-
-        def parse_date(val):
-            if not val:
-                return None
-            s = str(val).replace("Z", "+00:00").split("+")[0].split(".")[0]
-            for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
-                try:
-                    return datetime.strptime(s, fmt).replace(tzinfo=timezone.utc).isoformat()
-                except:
-                    continue
-            return str(val)
+                    v = v[0] if isinstance(v, list) else v
+                    break
+            resolved[field] = "" if v is None else v
 
         m = {}
 
@@ -167,29 +376,31 @@ class TikaProcessor(BaseProcessor):
         m["source_name"] = file_name
         m["source_type"] = file_ext
         m["source_size"] = len(binary)
-        m["content_md5"] = hashlib.md5(binary).hexdigest()
-        m["content_sha256"] = hashlib.sha256(binary).hexdigest()
+        # 内容哈希由 process 预先计算（调用方已提供 doc_id 且要求跳过时为 None）
+        if digests:
+            m["content_md5"] = digests["md5"]
+            m["content_sha256"] = digests["sha256"]
         m["ingest_at"] = datetime.now(timezone.utc).isoformat(sep="T", timespec="milliseconds")
 
         # 文档属性（title 保持原始美观，不过度清洗）
-        m["title"] = get("dc:title", "title", "pdf:docinfo:title", "subject") or os.path.splitext(file_name)[0]
-        m["author"] = get("dc:creator", "meta:author", "creator", "Author", "pdf:Author", "pdf:docinfo:creator") or ""
-        m["created_at"] = parse_date(get("dcterms:created", "meta:creation-date", "Creation-Date", "date"))
-        m["modified_at"] = parse_date(get("dcterms:modified", "Last-Modified", "meta:save-date"))
-        m["language"] = get("language", "dc:language", "Content-Language") or "zh-CN"
+        m["title"] = resolved["title"] or os.path.splitext(file_name)[0]
+        m["author"] = resolved["author"] or ""
+        m["created_at"] = self._parse_date(resolved["created_at"])
+        m["modified_at"] = self._parse_date(resolved["modified_at"])
+        m["language"] = resolved["language"] or "zh-CN"
 
         # 页数安全处理
-        pages = get("xmpTPg:NPages", "pdf:NPages", "Page-Count", "NumberOfPages")
+        pages = resolved["page_count"]
         try:
             m["page_count"] = int(pages) if pages and str(pages).isdigit() else 0
         except:
             m["page_count"] = 0
 
         # 业务字段
-        kw = get("keywords", "meta:keyword", "binary:Keywords") or ""
+        kw = resolved["keywords"] or ""
         m["keywords"] = [k.strip() for k in str(kw).split(",") if k.strip()]
-        m["company"] = get("Company", "dc:publisher") or ""
-        m["category"] = get("Category") or ""  # 密级常在这里
+        m["company"] = resolved["company"] or ""
+        m["category"] = resolved["category"] or ""  # 密级常在这里
         m["producer"] = raw_meta.get("pdf:Producer", "") or ""
 
         # 关键状态
@@ -211,15 +422,34 @@ class TikaProcessor(BaseProcessor):
 
         return m
 
+    # ============================== 内容摘要 ==============================
+    @staticmethod
+    def _content_digests(binary: bytes) -> Dict[str, str]:
+        """计算内容的 md5 / sha256（每个文档只在此处计算一次）"""
+        return {
+            "md5": hashlib.md5(binary).hexdigest(),
+            "sha256": hashlib.sha256(binary).hexdigest(),
+        }
+
+    # ============================== 日期解析 ==============================
+    @staticmethod
+    def _parse_date(val) -> Optional[str]:
+        if not val:
+            return None
+        s = str(val).replace("Z", "+00:00").split("+")[0].split(".")[0]
+        m = _DATE_RE.fullmatch(s)
+        if m:
+            try:
+                return datetime(*(int(g) for g in m.groups(default="0"))).replace(tzinfo=timezone.utc).isoformat()
+            except ValueError:
+                pass
+        return str(val)
+
     # ============================== 扫描 PDF 检测 ==============================
     @staticmethod
     def _detect_scanned_pdf(text: str, meta: dict) -> bool:
-        producer = (meta.get("producer") or "").lower()
-        scan_keywords = [
-            "scan", "image", "mfp", "scanner", "canon", "fujitsu",
-            "kodak", "hp", "ricoh", "epson", "pdfscan"
-        ]
-        if any(k in producer for k in scan_keywords):
+        producer = meta.get("producer") or ""
+        if _SCAN_RE.search(producer):
             return True
 
         page_count = meta.get("page_count") or 0
@@ -229,7 +459,7 @@ class TikaProcessor(BaseProcessor):
             except:
                 page_count = 0
 
-        if len(text.strip()) < 600 and page_count > 3:
+        if page_count > 3 and not _stripped_len_at_least(text, 600):
             return True
 
         return False
@@ -13,3 +13,10 @@ class BaseSink:
         不应返回数据；如需报告状态可把状态写到日志或外部监控系统。
         """
         raise NotImplementedError("BaseSink.write must be implemented by subclasses")
+
+    def flush(self, commit: bool = True) -> None:
+        """
+        把缓冲中尚未写出的数据落到目标。默认无缓冲，什么也不做；
+        批量写入的 sink 覆盖此方法。pipeline 结束时由 PipelineRunner 调用。
+        """
+        return None
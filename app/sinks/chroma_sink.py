@@ -1,14 +1,37 @@
+import uuid
+from typing import Dict, Any, Optional
+
 import chromadb
+import numpy as np
+from app.sinks.base import BaseSink
+
+# 单次 collection.add 的最大条数（Chroma 推荐的批量区间）
+ADD_BATCH_SIZE = 250
 
-class ChromaSink:
+
+class ChromaSink(BaseSink):
     def __init__(self):
         self.db = chromadb.Client()
+        self.col = self.db.get_or_create_collection("documents")
+
+    def write(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> None:
+        items = data.get("embeddings") or []
+        if not items:
+            return
 
-    def write(self, data):
-        col = self.db.get_or_create_collection("documents")
+        docs = [it["text"] for it in items]
+        # 以连续的 float32 矩阵传给 Chroma，避免逐个 Python float 转换；
+        # 上游若已提供 embeddings_matrix（ndarray）则直接复用，不再重新堆叠
+        embs = data.get("embeddings_matrix")
+        if embs is None:
+            embs = np.stack([np.asarray(it["embedding"], dtype=np.float32) for it in items])
+        embs = np.ascontiguousarray(embs, dtype=np.float32)
+        ids = [it.get("id") or str(uuid.uuid4()) for it in items]
 
-        for item in data["embeddings"]:
-            col.add(
-                documents=[item["text"]],
-                embeddings=[item["embedding"]]
+        # 批量写入，每批最多 ADD_BATCH_SIZE 条
+        for i in range(0, len(items), ADD_BATCH_SIZE):
+            self.col.add(
+                documents=docs[i:i + ADD_BATCH_SIZE],
+                embeddings=embs[i:i + ADD_BATCH_SIZE],
+                ids=ids[i:i + ADD_BATCH_SIZE],
             )
@@ -1,34 +1,96 @@
 # app/sinks/solr_sink.py
 
-from typing import Dict, Any, Optional
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+import orjson
 from app.sinks.base import BaseSink
-import requests
-from app.utility.config import Config  # 假设你已有统一 config
+from app.utility.config import get_settings  # 假设你已有统一 config
 from app.utility.log import logger
+from app.utility.utils import build_http_session
+
+# 所有 SolrSink 实例共享的连接池（Keep-Alive），避免每次写入都重新建立连接
+_SESSION = build_http_session(pool_connections=4, pool_maxsize=32)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# 缓冲满多少条 doc 时发送一次（commit=false）
+DEFAULT_BATCH_SIZE = 500
 
 class SolrSink(BaseSink):
-    def __init__(self, solr_url: Optional[str] = None, collection: Optional[str] = None):
-        self.solr_url = solr_url or Config.SOLR_URL
-        self.collection = collection or Config.SOLR_COLLECTION
+    def __init__(self, solr_url: Optional[str] = None, collection: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.solr_url = solr_url or get_settings().SOLR_URL
+        self.collection = collection or get_settings().SOLR_COLLECTION
         self.update_url = f"{self.solr_url}/solr/{self.collection}/update"
+        self.session = _SESSION
+        self.batch_size = batch_size
+        # 多个文件并发写入同一个 sink，缓冲区需要加锁
+        self._buf: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # 已发送但尚未 commit 的批次（flush 时需要提交）；中途批量发送失败后暂停发送，留给 flush 重试
+        self._uncommitted = False
+        self._defer = False
 
     def write(self, data: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> None:
         docs = data["solr_docs"]          # 1 document + N chunks
-        #logger.info(f"docs:{docs}")
         if not self.solr_url:
             # no-op or log
             return
-        """
-        logger.info("处理完成，solr doc 如下：\n%s",
-                    json.dumps(docs, ensure_ascii=False, indent=2))
-        """
-        logger.info(f"Starting to persist data, total number of docs:{len(docs or [])}")
+        # 只记录 doc id（不 dump 整个 doc），并按日志级别惰性格式化
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("solr docs for %s: %s", data.get("file_name"), [d.get("id") for d in docs or []])
+        with self._lock:
+            self._buf.extend(docs or [])
+            if self._defer or len(self._buf) < self.batch_size:
+                return
+            pending, self._buf = self._buf, []
+        # 批量发送但不提交，commit 统一在 flush() 时做一次
+        try:
+            self._post(pending, commit=False)
+        except Exception:
+            # 这批 doc 可能来自多个文件：放回缓冲区由 flush() 重试，结果由 flush 的成败统一决定
+            self._restore(pending, defer=True)
+            return
+        with self._lock:
+            self._uncommitted = True
+
+    def flush(self, commit: bool = True) -> None:
+        """发送缓冲区剩余的 doc；失败时 doc 放回缓冲区并抛出异常"""
+        if not self.solr_url:
+            return
+        with self._lock:
+            pending, self._buf = self._buf, []
+            uncommitted = self._uncommitted
+        # 本次既没有待发送的 doc，也没有待提交的批次时，不发送空的 [] 更新
+        if not pending and not (commit and uncommitted):
+            return
+        try:
+            self._post(pending, commit=commit)
+        except Exception:
+            self._restore(pending, defer=False)
+            raise
+        with self._lock:
+            self._uncommitted = not commit
+            self._defer = False
+
+    def _restore(self, pending: List[Dict[str, Any]], defer: bool) -> None:
+        with self._lock:
+            self._buf[:0] = pending
+            self._defer = self._defer or defer
+
+    def _post(self, docs: List[Dict[str, Any]], commit: bool) -> None:
+        logger.info("Starting to persist data, total number of docs:%d, commit:%s", len(docs), commit)
         try:
-            resp = requests.post(self.update_url, json=docs, params={"commit": "true"}, timeout=10)
+            # orjson 直接序列化为 UTF-8 bytes（不做 ASCII 转义），比 requests 的 json= 更快、体积更小
+            payload = orjson.dumps(docs, option=orjson.OPT_SERIALIZE_NUMPY)
+            resp = self.session.post(self.update_url, data=payload, headers=_JSON_HEADERS,
+                                     params={"commit": "true" if commit else "false"}, timeout=10)
             resp.raise_for_status()
             logger.info("completed to persist data")
         except Exception as e:
-            logger.error(f"solr sink failed: {e}")
+            logger.error("solr sink failed: %s", e)
             # 这里不要 raise（或者根据需要决定），以免阻塞整个 pipeline
             # 建议记录日志
             raise
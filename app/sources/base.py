@@ -5,8 +5,11 @@ from typing import Dict, Any, Optional
 class BaseSource:
     """
     Source 基类：所有数据来源（文件/数据库/API）请继承此类并实现 read().
+    基类声明空 __slots__，子类自行声明 __slots__ 时实例才不会带 __dict__。
     """
 
+    __slots__ = ()
+
     def read(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         读取数据并返回字典。
@@ -1,13 +1,24 @@
 # app/sources/base64_source.py
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Union
 from app.sources.base import BaseSource
-import base64
+import binascii
+
+# 分块解码时需要剔除的空白字符（换行分隔的 base64 很常见）
+_B64_WHITESPACE = b" \t\r\n\v\f"
 
 
 class Base64Source(BaseSource):
-    def __init__(self, filename: str, base64_str: str):
+    # user_metadata 由 ingest 路由在创建后赋值
+    __slots__ = ("filename", "base64_bytes", "user_metadata")
+
+    def __init__(self, filename: str, base64_str: Union[str, bytes, bytearray]):
         self.filename = filename
-        self.base64_str = base64_str
+        self.user_metadata = None
+        # 统一保存为 bytes，解码时不再产生一份临时的 str -> bytes 拷贝
+        try:
+            self.base64_bytes = base64_str.encode("ascii") if isinstance(base64_str, str) else base64_str
+        except UnicodeEncodeError as e:
+            raise RuntimeError(f"Invalid base64 content: {e}")
 
     def read(self, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         if context is None:
@@ -16,7 +27,7 @@ class Base64Source(BaseSource):
         context.setdefault("file", {})["filename"] = self.filename
 
         try:
-            content = base64.b64decode(self.base64_str)
+            content = binascii.a2b_base64(self.base64_bytes)
         except Exception as e:
             raise RuntimeError(f"Invalid base64 content: {e}")
 
@@ -24,3 +35,23 @@ class Base64Source(BaseSource):
             "file_name": self.filename,
             "binary": content
         }
+
+    def iter_decoded(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        按块解码（每块约 chunk_size 个 base64 字符），适合边解码边写出的流式场景，
+        不必同时在内存里持有完整的编码串和完整的解码结果。
+        """
+        view = memoryview(self.base64_bytes)
+        carry = b""
+        try:
+            for i in range(0, len(view), chunk_size):
+                block = carry + bytes(view[i:i + chunk_size]).translate(None, _B64_WHITESPACE)
+                # 只解码 4 字符对齐的部分，余下的留到下一块
+                cut = len(block) - len(block) % 4
+                carry = block[cut:]
+                if cut:
+                    yield binascii.a2b_base64(block[:cut])
+            if carry:
+                yield binascii.a2b_base64(carry)
+        except binascii.Error as e:
+            raise RuntimeError(f"Invalid base64 content: {e}")
@@ -0,0 +1,42 @@
+# app/sources/email_item.py
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+
+@dataclass(slots=True)
+class EmailItem:
+    """
+    邮件 Source 内部使用的条目（正文或附件）。
+    slots 类比同结构的 dict 省内存、字段访问更快；交给 pipeline 前再用 to_dict() 转成 dict。
+    """
+    doc_id: str
+    file_name: str
+    binary: Optional[bytes]
+    raw_text: Optional[str]
+    source_path: str
+    source_type: str
+    user_metadata: Dict[str, Any]
+    title: Optional[str] = None
+    # 附件内容落盘后的临时文件路径及字节数（此时 binary 为 None）
+    binary_path: Optional[str] = None
+    content_length: Optional[int] = None
+    # 正文评分（附件为 0），仅用于排序，同时也保留在 user_metadata 里
+    content_score: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """浅拷贝成 pipeline 使用的 dict（不复制 binary）"""
+        data = {
+            "doc_id": self.doc_id,
+            "file_name": self.file_name,
+            "binary": self.binary,
+            "raw_text": self.raw_text,
+            "source_path": self.source_path,
+            "source_type": self.source_type,
+            "user_metadata": self.user_metadata,
+        }
+        if self.title is not None:
+            data["title"] = self.title
+        if self.binary_path is not None:
+            data["binary_path"] = self.binary_path
+            data["content_length"] = self.content_length
+        return data
@@ -1,14 +1,40 @@
 import os
-import email
+import re
 import json
 import hashlib
-from typing import Dict, Any, Optional, List
 import asyncio
-import aioimaplib
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Dict, Any, Optional, List, Set
 from email.header import decode_header
+from email.parser import BytesParser
+from email.policy import compat32
 import trafilatura
+from charset_normalizer import from_bytes
 from app.sources.base import BaseSource
+from app.sources.email_item import EmailItem
+from app.sources.imap_connection import (
+    ImapConnection, FETCH_CHUNK_SIZE, codec_name, compress_uid_set, get_parse_pool, redundant_html_parts,
+    split_fetch_response,
+)
 from app.utility.log import logger
+from app.utility.utils import remove_spilled, spill_to_tempfile
+
+# 模块级共享的邮件解析器（compat32 与 message_from_bytes 默认一致），避免每封邮件重建 parser/policy
+_EMAIL_PARSER = BytesParser(policy=compat32)
+
+# UID SEARCH 响应中的 UID（直接在 bytes 上匹配，跳过 decode + split）
+_SEARCH_UID_RE = re.compile(rb"\d+")
+
+# 状态日志压缩阈值的下限，避免快照很小时频繁重写
+STATE_COMPACT_MIN = 1000
+
+# 正文声明这些字符集时直接按 UTF-8 处理
+_IGNORED_BODY_CHARSETS = frozenset(["unknown-8bit", "8bit", "binary", "default", "ascii", "none"])
+
+# 正文抽取结果缓存（按解析进程各自维护），重复的群发/订阅邮件只抽取一次
+EXTRACT_CACHE_SIZE = 256
+_extract_cache: "OrderedDict[bytes, str]" = OrderedDict()
 
 
 class EmailSource(BaseSource):
@@ -48,90 +74,82 @@ class EmailSource(BaseSource):
         self.state_file = state_file
         self.user_metadata = user_metadata if user_metadata else {}
         self.source_type = source_type
-
-        if reset_state or not os.path.exists(self.state_file):
-            self.seen_uids: set = set()
+        # 持久化 IMAP 连接，多次 read() 之间复用 TLS + LOGIN
+        self._conn = ImapConnection(host, port, username, password, use_ssl=use_ssl)
+
+        # 状态 = JSON 快照 + 追加日志（每行一个 UID），日志过大时再压缩回快照
+        self._state_log = self.state_file + ".log"
+        self._snapshot_size = 0
+        self._log_size = 0
+        # UID 统一按 int 保存（解析时一次转换，之后的比较、排序都不再重复 int()）
+        self.seen_uids: Set[int] = set()
+        # 已处理完的最大 UID，下次只 UID SEARCH 其后的邮件
+        self.last_max_uid = 0
+
+        if reset_state:
+            self._compact_state()
         else:
-            try:
-                with open(self.state_file, "r", encoding="utf-8") as f:
-                    self.seen_uids = set(json.load(f))
-            except Exception:
-                self.seen_uids = set()
+            self._load_state()
 
     # ----------------------
     # 外部同步接口
     # ----------------------
     def read(self, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         try:
-            return asyncio.run(self._async_read(context))
-        except RuntimeError as e:
-            if "cannot run" in str(e):
-                loop = asyncio.get_event_loop()
-                return loop.run_until_complete(self._async_read(context))
-            raise e
+            return self._conn.run(self._async_read(context))
         except Exception as e:
             logger.error(f"Failed to run async email read: {e}")
             return []
 
+    def close(self) -> None:
+        """登出并释放持久化的 IMAP 连接"""
+        self._conn.close()
+
+    def wait_for_new_mail(self, timeout: float = 25 * 60) -> bool:
+        """
+        用 IMAP IDLE 阻塞等待服务器推送（EXISTS），有新邮件返回 True，超时返回 False。
+        常驻轮询时可写成：while True: if source.wait_for_new_mail(): source.read()
+        服务器不支持 IDLE 时直接返回 True，由调用方退化为普通轮询。
+        """
+        try:
+            return self._conn.run(self._async_wait_for_new_mail(timeout))
+        except Exception as e:
+            logger.error(f"EmailSource IDLE failed: {e}")
+            return False
+
     # ----------------------
     # 内部异步逻辑
     # ----------------------
     async def _async_read(self, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        results: List[Dict[str, Any]] = []
+        results: List[EmailItem] = []
 
-        client = aioimaplib.IMAP4_SSL(self.host, self.port) if self.use_ssl else aioimaplib.IMAP4(self.host, self.port)
-        try:
-            await client.wait_hello_from_server()
-            login_resp = await client.login(self.username, self.password)
-            if login_resp.result != "OK":
-                logger.error(f"EmailSource login failed: {login_resp.lines}")
-                return results
-
-            select_resp = await client.select(self.mailbox)
-            if select_resp.result != "OK":
-                logger.error(f"EmailSource select mailbox {self.mailbox} failed: {select_resp.lines}")
-                return results
+        # 复用已有连接（NOOP 探活），失效时才重新登录
+        client = await self._conn.acquire(self.mailbox)
+        if client is None:
+            return results
 
+        try:
             # ----------------------
-            # 获取全量邮件 sequence numbers
+            # 只搜索 last_max_uid 之后的 UID，由服务器端过滤，流量与新邮件数成正比
             # ----------------------
-            search_resp = await client.search("ALL")
+            search_resp = await client.uid_search(f"UID {self.last_max_uid + 1}:*")
             if search_resp.result != "OK":
-                logger.error(f"EmailSource SEARCH ALL failed: {search_resp.lines}")
+                logger.error(f"EmailSource UID SEARCH failed: {search_resp.lines}")
                 return results
 
-            seq_nums = search_resp.lines[0].decode().split()
-            if not seq_nums:
-                logger.info("No emails found in mailbox.")
+            # 收集时直接转成 int 集合去重，再排序一次
+            # 注意：n:* 在没有更大 UID 时仍会返回当前最大 UID，这里再按 last_max_uid 过滤一次
+            uid_set = {int(uid) for uid in _SEARCH_UID_RE.findall(search_resp.lines[0])} if search_resp.lines else set()
+            uid_list = sorted(uid for uid in uid_set if uid > self.last_max_uid)
+            if not uid_list:
+                logger.info("No new emails found in mailbox.")
                 return results
 
-            # ----------------------
-            # 获取对应 UID 列表
-            # ----------------------
-            uid_list = []
-            for seq in seq_nums:
-                fetch_uid_resp = await client.fetch(seq, "(UID)")
-                if fetch_uid_resp.result != "OK":
-                    continue
-                for line in fetch_uid_resp.lines:
-                    try:
-                        line_str = line.decode()
-                        if "UID" in line_str:
-                            uid_part = line_str.split("UID", 1)[1].strip()
-                            uid = uid_part.strip(")").split()[0]
-                            if uid.isdigit():
-                                uid_list.append(uid)
-                    except Exception:
-                        continue
-
-            # 去重 + 排序
-            uid_list = sorted(list(set(uid_list)), key=int)
-
             # 增量筛选
             new_uids = [uid for uid in uid_list if uid not in self.seen_uids]
             if not new_uids:
                 logger.info("No new emails to fetch.")
-                await client.logout()
+                self._advance_last_max_uid(uid_list)
                 return results
 
             # 最近 max_emails
@@ -139,121 +157,182 @@ class EmailSource(BaseSource):
 
             semaphore = asyncio.Semaphore(self.concurrency)
 
-            async def fetch_email(uid: str):
+            async def fetch_chunk(uids: List[int]) -> List[EmailItem]:
                 async with semaphore:
+                    uid_set = compress_uid_set(uids)
                     try:
-                        fetch_resp = await client.uid("FETCH", uid, "(RFC822)")
-                        if fetch_resp.result != "OK":
-                            logger.warning(f"Email fetch {uid} failed: {fetch_resp.lines}")
-                            return []
-
-                        raw_email = b"".join(fetch_resp.lines[1:-1])
-                        msg = email.message_from_bytes(raw_email)
-
-                        subject = self._decode_header(msg.get("Subject"))
-                        date_str = self._decode_header(msg.get("Date"))
-                        sender = self._decode_header(msg.get("From"))
-
-                        raw_text = ""
-                        attachments = []
-
-                        for part in msg.walk():
-                            content_type = part.get_content_type()
-                            disposition = part.get_content_disposition()
-                            payload = part.get_payload(decode=True)
-
-                            if disposition == "attachment" and payload:
-                                filename = self._decode_header(part.get_filename()) or "attachment.bin"
-                                attachments.append({
-                                    "file_name": filename,
-                                    "binary": payload,
-                                    "content_type": content_type
-                                })
-                            elif content_type in ["text/plain", "text/html"] and payload:
-                                charsets_to_try = []
-                                original_charset = part.get_content_charset()
-                                if original_charset and original_charset.lower() not in ["unknown-8bit", "8bit", "binary", "default", "ascii", "none"]:
-                                    charsets_to_try.append(original_charset)
-                                charsets_to_try.extend(["utf-8", "latin-1"])
-
-                                decoded = False
-                                for cs in charsets_to_try:
-                                    try:
-                                        text = payload.decode(cs, errors="ignore")
-                                        raw_text += text + "\n"
-                                        decoded = True
-                                        break
-                                    except Exception:
-                                        continue
-                                if not decoded:
-                                    logger.warning(f"Failed decoding email part for UID {uid}")
-
-                        extracted_text = trafilatura.extract(raw_text) or ""
-                        content_score = len(extracted_text.strip())
-                        doc_id = hashlib.sha256((subject + date_str + sender).encode("utf-8")).hexdigest()[:16]
-
-                        items: List[Dict[str, Any]] = []
-
-                        # 邮件正文
-                        items.append({
-                            "doc_id": doc_id,
-                            "file_name": f"{subject or 'email'}.txt",
-                            "binary": extracted_text.encode("utf-8"),
-                            "raw_text": extracted_text,
-                            "source_path": f"imap://{self.username}@{self.host}/{self.mailbox}/{uid}",
-                            "source_type": self.source_type,
-                            "user_metadata": {
-                                "subject": subject,
-                                "from": sender,
-                                "date": date_str,
-                                "content_score": content_score,
-                                **self.user_metadata
-                            }
-                        })
-
-                        # 附件
-                        for att in attachments:
-                            att_doc_id = hashlib.sha256((doc_id + att["file_name"]).encode("utf-8")).hexdigest()[:16]
-                            items.append({
-                                "doc_id": att_doc_id,
-                                "file_name": att["file_name"],
-                                "binary": att["binary"],
-                                "raw_text": None,
-                                "source_path": f"imap://{self.username}@{self.host}/{self.mailbox}/{uid}/attachment/{att['file_name']}",
-                                "source_type": f"{self.source_type}_attachment",
-                                "user_metadata": {
-                                    "subject": subject,
-                                    "from": sender,
-                                    "date": date_str,
-                                    "content_type": att["content_type"],
-                                    **self.user_metadata
-                                }
-                            })
-
-                        self.seen_uids.add(uid)
-                        return items
+                        # BODY.PEEK[] 不会把邮件标记为 \Seen
+                        fetch_resp = await client.uid("FETCH", uid_set, "(BODY.PEEK[])")
                     except Exception as e:
-                        logger.error(f"Email fetch error {uid}: {e}")
+                        logger.error(f"Email fetch error {uid_set}: {e}")
+                        return []
+                    if fetch_resp.result != "OK":
+                        logger.warning(f"Email fetch {uid_set} failed: {fetch_resp.lines}")
                         return []
 
-            all_results = await asyncio.gather(*[fetch_email(uid) for uid in new_uids])
-            for batch in all_results:
-                results.extend(batch)
+                # 解析属于 CPU 密集操作，放到进程池执行，与其它 FETCH 并行
+                messages = [(int(uid), raw_email) for uid, raw_email in split_fetch_response(fetch_resp.lines)]
+                parsed = await asyncio.gather(*[
+                    self._parse_in_pool(uid, raw_email) for uid, raw_email in messages
+                ])
+                for (uid, _), items in zip(messages, parsed):
+                    if items:
+                        self.seen_uids.add(uid)
+                # 本批解析成功的 UID 追加写入状态日志
+                self._append_state([uid for uid in uids if uid in self.seen_uids])
+                return [item for items in parsed for item in items]
+
+            # 按 UID 集合批量 FETCH，每批 FETCH_CHUNK_SIZE 封，避免逐封往返
+            chunks = [new_uids[i:i + FETCH_CHUNK_SIZE] for i in range(0, len(new_uids), FETCH_CHUNK_SIZE)]
+            # 哪批先完成就先并入结果，不必等全部完成后再合并一份 list-of-lists
+            for done in asyncio.as_completed([fetch_chunk(chunk) for chunk in chunks]):
+                results.extend(await done)
+
+            # 按正文评分排序（原地排序，不再复制列表）
+            results.sort(key=attrgetter("content_score"), reverse=True)
+
+            self._advance_last_max_uid(uid_list)
+
+            # 日志条数超过快照的 2 倍时压缩
+            if self._log_size > 2 * max(self._snapshot_size, STATE_COMPACT_MIN):
+                self._compact_state()
+
+        except Exception:
+            # 结果不会返回给 pipeline，已落盘的附件在此删除
+            for item in results:
+                remove_spilled(item.binary_path)
+            # 连接状态未知，丢弃后下次重连
+            await self._conn.reset()
+            raise
+        finally:
+            self._conn.release()
 
-            # 按正文评分排序
-            results.sort(key=lambda x: x.get("user_metadata", {}).get("content_score", 0), reverse=True)
+        # 在 pipeline 边界转换成 dict
+        return [item.to_dict() for item in results]
 
-            # 更新状态文件
-            try:
-                with open(self.state_file, "w", encoding="utf-8") as f:
-                    json.dump(list(self.seen_uids), f)
-            except Exception as e:
-                logger.warning(f"Failed to save email state: {e}")
+    async def _parse_in_pool(self, uid: int, raw_email: bytes) -> List[EmailItem]:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                get_parse_pool(), _parse_one, uid, raw_email,
+                self.username, self.host, self.mailbox, self.source_type, self.user_metadata,
+            )
+        except Exception as e:
+            logger.error(f"Email parse error {uid}: {e}")
+            return []
 
+    async def _async_wait_for_new_mail(self, timeout: float) -> bool:
+        client = await self._conn.acquire(self.mailbox)
+        if client is None:
+            return False
+        try:
+            if not client.has_capability("IDLE"):
+                return True
+            idle = await client.idle_start(timeout=timeout)
+            try:
+                push = await client.wait_server_push(timeout=timeout)
+            except asyncio.TimeoutError:
+                push = []
+            finally:
+                client.idle_done()
+                await asyncio.wait_for(idle, 10)
+            if not isinstance(push, list):
+                return False
+            return any(b"EXISTS" in (line if isinstance(line, (bytes, bytearray)) else str(line).encode())
+                       for line in push)
+        except Exception:
+            await self._conn.reset()
+            raise
         finally:
-            await client.logout()
+            self._conn.release()
+
+    # ----------------------
+    # 状态文件
+    # ----------------------
+    def _load_state(self) -> None:
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                # 兼容旧格式：快照只是一个 UID 列表
+                if isinstance(state, list):
+                    state = {"seen_uids": state}
+                # 旧快照里的 UID 是字符串，统一转成 int
+                self.seen_uids = set(map(int, state.get("seen_uids") or []))
+                self.last_max_uid = int(state.get("last_max_uid") or 0)
+                self._snapshot_size = len(self.seen_uids)
+            if os.path.exists(self._state_log):
+                with open(self._state_log, "r", encoding="utf-8") as f:
+                    for line in f:
+                        entry = line.strip()
+                        if entry.startswith("max:"):
+                            self.last_max_uid = max(self.last_max_uid, int(entry[4:]))
+                        elif entry:
+                            self.seen_uids.add(int(entry))
+                        self._log_size += 1
+        except Exception as e:
+            logger.warning(f"Failed to load email state: {e}")
+            self.seen_uids = set()
+            self.last_max_uid = 0
+
+    def _append_state(self, entries: List[Any]) -> None:
+        """追加状态日志：UID（int）或 "max:N" 记录，每行一条"""
+        if not entries:
+            return
+        try:
+            with open(self._state_log, "a", encoding="utf-8") as f:
+                f.write("".join(f"{entry}\n" for entry in entries))
+            self._log_size += len(entries)
+        except Exception as e:
+            logger.warning(f"Failed to append email state: {e}")
+
+    def _advance_last_max_uid(self, uid_list: List[int]) -> None:
+        """
+        推进 last_max_uid：只推进到第一封仍未处理的邮件之前，
+        这样被 max_emails 截掉或解析失败的旧邮件下次仍会被搜索到。
+        """
+        unseen = [uid for uid in uid_list if uid not in self.seen_uids]
+        new_max = unseen[0] - 1 if unseen else uid_list[-1]
+        if new_max <= self.last_max_uid:
+            return
+        self.last_max_uid = new_max
+        self._append_state([f"max:{new_max}"])
+
+    def _compact_state(self) -> None:
+        """把 seen_uids 原子地写回快照（tmp + os.replace），然后清空追加日志"""
+        tmp = self.state_file + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"seen_uids": list(self.seen_uids), "last_max_uid": self.last_max_uid}, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.state_file)
+            # 快照已包含日志中的全部 UID，即使此处失败，重复条数也不影响结果
+            open(self._state_log, "w").close()
+            self._snapshot_size = len(self.seen_uids)
+            self._log_size = 0
+        except Exception as e:
+            logger.warning(f"Failed to save email state: {e}")
 
-        return results
+    @staticmethod
+    def _decode_payload(payload: bytes, charset: Optional[str]) -> Optional[str]:
+        """
+        正文解码：先严格按声明的字符集、再按 UTF-8 解码（errors="ignore" 会让第一次尝试必然“成功”并悄悄丢字节）；
+        都失败时交给 charset_normalizer 检测一次，最后兜底 latin-1。
+        """
+        if charset and charset.lower() not in _IGNORED_BODY_CHARSETS:
+            try:
+                return payload.decode(charset)
+            except (UnicodeDecodeError, LookupError):
+                pass
+        try:
+            return payload.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        best = from_bytes(payload).best()
+        if best is not None:
+            return str(best)
+        return payload.decode("latin-1")
 
     # ----------------------
     # 强化 Header 解码
@@ -262,23 +341,134 @@ class EmailSource(BaseSource):
     def _decode_header(val: Optional[str]) -> str:
         if not val:
             return ""
+        # 纯 ASCII 且不含 RFC 2047 编码字（=?charset?...?=）的头直接返回，跳过 decode_header
+        if isinstance(val, str) and val.isascii() and "=?" not in val:
+            return val
         decoded_fragments = decode_header(val)
-        decoded_str = ""
+        parts = []
         for fragment, encoding in decoded_fragments:
-            try:
-                if isinstance(fragment, bytes):
-                    charset_candidates = []
-                    if encoding and isinstance(encoding, str) and encoding.lower() not in ["unknown-8bit", "8bit", "binary", "default", "none"]:
-                        charset_candidates.append(encoding)
-                    charset_candidates.extend(["utf-8", "latin-1"])
-                    for cs in charset_candidates:
-                        try:
-                            decoded_str += fragment.decode(cs, errors="ignore")
-                            break
-                        except Exception:
-                            continue
+            if isinstance(fragment, bytes):
+                # errors="replace" 不会抛异常，一次解码即可，无需逐个字符集重试
+                parts.append(fragment.decode(codec_name(encoding), errors="replace"))
+            else:
+                parts.append(fragment)
+        return "".join(parts)
+
+
+def _extract_text(raw_text: str) -> str:
+    """trafilatura 正文抽取，结果按内容摘要做 LRU 缓存"""
+    key = hashlib.blake2b(raw_text.encode("utf-8", errors="surrogatepass"), digest_size=16).digest()
+    cached = _extract_cache.get(key)
+    if cached is not None:
+        _extract_cache.move_to_end(key)
+        return cached
+
+    extracted = trafilatura.extract(raw_text) or ""
+    _extract_cache[key] = extracted
+    if len(_extract_cache) > EXTRACT_CACHE_SIZE:
+        _extract_cache.popitem(last=False)
+    return extracted
+
+
+def _parse_one(uid: int, raw_email: bytes, username: str, host: str, mailbox: str,
+               source_type: str, user_metadata: Dict[str, Any]) -> List[EmailItem]:
+    """解析单封邮件，返回正文及附件 items（在解析进程池中执行，参数与返回值都需可 pickle）"""
+    attachments = []
+    try:
+        msg = _EMAIL_PARSER.parsebytes(raw_email)
+
+        subject = EmailSource._decode_header(msg.get("Subject"))
+        date_str = EmailSource._decode_header(msg.get("Date"))
+        sender = EmailSource._decode_header(msg.get("From"))
+
+        plain_parts: List[str] = []
+        html_parts: List[str] = []
+        skip_html = redundant_html_parts(msg)
+
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            disposition = part.get_content_disposition()
+            payload = part.get_payload(decode=True)
+
+            if disposition == "attachment" and payload:
+                filename = EmailSource._decode_header(part.get_filename()) or "attachment.bin"
+                # 附件内容直接落盘，结果里只带路径，避免整批附件字节跨进程传递并常驻内存
+                attachments.append({
+                    "file_name": filename,
+                    "binary_path": spill_to_tempfile(payload, suffix=os.path.splitext(filename)[1],
+                                                     prefix="email_att_"),
+                    "content_length": len(payload),
+                    "content_type": content_type
+                })
+            elif content_type in ["text/plain", "text/html"] and payload and id(part) not in skip_html:
+                text = EmailSource._decode_payload(payload, part.get_content_charset())
+                if text is None:
+                    logger.warning(f"Failed decoding email part for UID {uid}")
+                elif content_type == "text/html":
+                    html_parts.append(text)
                 else:
-                    decoded_str += str(fragment)
-            except Exception:
-                continue
-        return decoded_str
+                    plain_parts.append(text)
+
+        # trafilatura 只处理 HTML 部分，text/plain 部分原样拼接在后面（纯文本邮件完全不调用）；
+        # 与 text/plain 同属一个 multipart/alternative 的 HTML 已在上面跳过，避免同一正文计入两次
+        if html_parts:
+            extracted_text = "\n".join(filter(None, [_extract_text("\n".join(html_parts)), *plain_parts]))
+        else:
+            extracted_text = "\n".join(plain_parts)
+        content_score = len(extracted_text.strip())
+        # 字段间以 \x1f（单元分隔符）拼接，避免 "ab"+"c" 与 "a"+"bc" 得到相同的 ID
+        doc_id = hashlib.blake2b(
+            b"\x1f".join([subject.encode("utf-8"), date_str.encode("utf-8"), sender.encode("utf-8")]),
+            digest_size=8,
+        ).hexdigest()
+
+        items: List[EmailItem] = []
+
+        # 邮件正文
+        items.append(EmailItem(
+            doc_id=doc_id,
+            file_name=f"{subject or 'email'}.txt",
+            binary=extracted_text.encode("utf-8"),
+            raw_text=extracted_text,
+            source_path=f"imap://{username}@{host}/{mailbox}/{uid}",
+            source_type=source_type,
+            user_metadata={
+                "subject": subject,
+                "from": sender,
+                "date": date_str,
+                "content_score": content_score,
+                **user_metadata
+            },
+            content_score=content_score,
+        ))
+
+        # 附件
+        for att in attachments:
+            att_doc_id = hashlib.blake2b(
+                b"\x1f".join([doc_id.encode("ascii"), att["file_name"].encode("utf-8")]), digest_size=8
+            ).hexdigest()
+            items.append(EmailItem(
+                doc_id=att_doc_id,
+                file_name=att["file_name"],
+                binary=None,
+                binary_path=att["binary_path"],
+                content_length=att["content_length"],
+                raw_text=None,
+                source_path=f"imap://{username}@{host}/{mailbox}/{uid}/attachment/{att['file_name']}",
+                source_type=f"{source_type}_attachment",
+                user_metadata={
+                    "subject": subject,
+                    "from": sender,
+                    "date": date_str,
+                    "content_type": att["content_type"],
+                    **user_metadata
+                }
+            ))
+
+        return items
+    except Exception as e:
+        logger.error(f"Email parse error {uid}: {e}")
+        # 这封邮件的结果被丢弃，已落盘的附件一并删除
+        for att in attachments:
+            remove_spilled(att["binary_path"])
+        return []
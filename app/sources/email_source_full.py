@@ -1,18 +1,63 @@
-import email
+import os
+import re
 import hashlib
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import asyncio
-import aioimaplib
+from operator import attrgetter
 from email.header import decode_header
+from email.parser import BytesParser
+from email.policy import compat32
 import trafilatura
 
+try:
+    # Rust 实现的邮件解析器，比标准库 email 快一个数量级；未安装时只用标准库
+    from fast_mail_parser import parse_email as fast_parse_email
+except ImportError:
+    fast_parse_email = None
+
+try:
+    # Resiliparse 的正文抽取比 trafilatura 快一个数量级；未安装时退回 trafilatura
+    from resiliparse.extract.html2text import extract_plain_text
+except ImportError:
+    extract_plain_text = None
+
 from app.sources.base import BaseSource
+from app.sources.email_item import EmailItem
+from app.sources.imap_connection import (
+    ImapConnection, FETCH_CHUNK_SIZE, codec_name, compress_uid_set, get_parse_pool, has_alternative,
+    redundant_html_parts, split_fetch_response,
+)
 from app.utility.log import logger
+from app.utility.utils import remove_spilled, spill_to_tempfile
+
+# 模块级共享的邮件解析器（compat32 与 message_from_bytes 默认一致），避免每封邮件重建 parser/policy
+_EMAIL_PARSER = BytesParser(policy=compat32)
+
+# UID SEARCH 响应中的 UID（直接在 bytes 上匹配，跳过 decode + split）
+_SEARCH_UID_RE = re.compile(rb"\d+")
+
+
+def _html_to_text(html: str) -> str:
+    """HTML 正文抽取（只对 text/html 部分调用，text/plain 部分原样保留）"""
+    if extract_plain_text is not None:
+        return extract_plain_text(html, main_content=True) or ""
+    return trafilatura.extract(html) or ""
+
+
+def _join_body(plain_parts: List[str], html_parts: List[str]) -> List[str]:
+    """HTML 部分合并后抽取一次正文（抽取失败时保留原文），text/plain 部分原样接在后面"""
+    if not html_parts:
+        return plain_parts
+    html = "\n".join(html_parts)
+    return [_html_to_text(html) or html, *plain_parts]
 
 
 class EmailSourceFull(BaseSource):
     """极简全量 Email 抓取（不做增量、不持久化 state）"""
 
+    __slots__ = ("host", "port", "username", "password", "mailbox", "use_ssl", "concurrency",
+                 "user_metadata", "source_type", "max_emails", "_conn")
+
     def __init__(
         self,
         host: str,
@@ -36,64 +81,37 @@ class EmailSourceFull(BaseSource):
         self.user_metadata = user_metadata or {}
         self.source_type = source_type
         self.max_emails = max_emails
+        # 持久化 IMAP 连接（全局 timeout 30s），多次 read() 之间复用 TLS + LOGIN
+        self._conn = ImapConnection(host, port, username, password, use_ssl=use_ssl, timeout=30)
 
     def read(self, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        try:
-            return asyncio.run(self._async_read(context))
-        except RuntimeError:  # 已经在事件循环中
-            loop = asyncio.get_event_loop()
-            return loop.run_until_complete(self._async_read(context))
+        return self._conn.run(self._async_read(context))
+
+    def close(self) -> None:
+        """登出并释放持久化的 IMAP 连接"""
+        self._conn.close()
 
     async def _async_read(self, context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        results: List[Dict[str, Any]] = []
+        results: List[EmailItem] = []
 
-        # 初始化客户端时设置全局 timeout
-        client = aioimaplib.IMAP4_SSL(self.host, self.port, timeout=30) if self.use_ssl else aioimaplib.IMAP4(self.host,
-                                                                                                              self.port,
-                                                                                                              timeout=30)
+        # 复用已有连接（NOOP 探活），失效时才重新登录
+        client = await self._conn.acquire(self.mailbox)
+        if client is None:
+            return results
 
         try:
-            await client.wait_hello_from_server()
-
-            login_resp = await client.login(self.username, self.password)
-            if login_resp.result != "OK":
-                logger.error(f"Login failed: {login_resp.lines}")
-                return results
-
-            select_resp = await client.select(self.mailbox)
-            if select_resp.result != "OK":
-                logger.error(f"Select mailbox failed: {select_resp.lines}")
-                return results
-
-            # 修复：用普通 SEARCH 获取序列号
-            search_resp = await client.search(None, "ALL")
+            # UID SEARCH 一次请求直接拿到全部 UID
+            search_resp = await client.uid_search("ALL")
             if search_resp.result != "OK":
-                logger.error(f"SEARCH ALL failed: {search_resp.lines}")
+                logger.error(f"UID SEARCH ALL failed: {search_resp.lines}")
                 return results
 
             if not search_resp.lines or not search_resp.lines[0]:
                 logger.info("Mailbox is empty.")
                 return results
 
-            seq_nums = search_resp.lines[0].decode('utf-8', errors='ignore').split()
-            if not seq_nums:
-                return results
-
-            # 批量获取所有 UIDs（高效，一次请求）
-            uids_resp = await client.fetch(",".join(seq_nums), "(UID)")
-            if uids_resp.result != "OK":
-                logger.error(f"Bulk UID fetch failed: {uids_resp.lines}")
-                return results
-
-            uids = []
-            for line in uids_resp.lines:
-                line_str = line.decode('utf-8', errors='ignore')
-                if "UID " in line_str:
-                    uid_match = line_str.split("UID ")[1].split(" ")[0].split(")")[0].strip()
-                    if uid_match.isdigit():
-                        uids.append(uid_match)
-
-            uids = sorted(set(uids), key=int)  # 去重 + 按 UID 升序
+            # 收集时直接转成 int 集合去重，再排序一次（不必逐个 decode，也不用 key=int 重复转换）
+            uids = sorted({int(uid) for uid in _SEARCH_UID_RE.findall(search_resp.lines[0])})
 
             logger.info(f"Found {len(uids)} emails in total.")
 
@@ -107,154 +125,219 @@ class EmailSourceFull(BaseSource):
 
             semaphore = asyncio.Semaphore(self.concurrency)
 
-            async def fetch_email(uid: str) -> List[Dict[str, Any]]:
+            async def fetch_chunk(chunk: List[int]) -> List[EmailItem]:
+                # 信号量只限制 IMAP FETCH，解析不占用名额
                 async with semaphore:
+                    uid_set = compress_uid_set(chunk)
                     try:
-                        # 使用 UID FETCH (BODY[]) - 这个是支持 UID 的
-                        fetch_resp = await client.uid("FETCH", uid, "(BODY[])")
-                        if fetch_resp.result != "OK":
-                            logger.warning(f"UID {uid} fetch failed")
-                            return []
-
-                        # 正确拼接邮件原始内容
-                        if len(fetch_resp.lines) < 3:
-                            return []
-
-                        raw_email = b"\r\n".join(fetch_resp.lines[1:-1])
-                        if not raw_email:
-                            return []
-
-                        msg = email.message_from_bytes(raw_email)
-
-                        subject = self._decode_header(msg.get("Subject", ""))
-                        date_str = self._decode_header(msg.get("Date", ""))
-                        sender = self._decode_header(msg.get("From", ""))
-
-                        raw_text = ""
-                        attachments = []
-
-                        for part in msg.walk():
-                            ctype = part.get_content_type()
-                            disposition = part.get_content_disposition()
-
-                            payload = part.get_payload(decode=True)
-                            if not payload:
-                                continue
-
-                            if disposition == "attachment":
-                                filename = self._decode_header(part.get_filename()) or "unknown.bin"
-                                attachments.append({
-                                    "file_name": filename,
-                                    "binary": payload,
-                                    "content_type": ctype,
-                                })
-                            elif ctype == "text/plain":
-                                raw_text += payload.decode('utf-8', errors='ignore') + "\n"
-                            elif ctype == "text/html":
-                                html = payload.decode('utf-8', errors='ignore')
-                                text = trafilatura.extract(html)
-                                raw_text += (text or html) + "\n"
-
-                        extracted_text = raw_text.strip()
-                        score = len(extracted_text)
-
-                        # 主文档 ID
-                        doc_id = hashlib.sha256(
-                            (subject + date_str + sender + uid).encode('utf-8')
-                        ).hexdigest()[:16]
-
-                        items: List[Dict[str, Any]] = []
-
-                        # 正文文档
-                        items.append({
-                            "doc_id": doc_id,
-                            "file_name": f"{subject or 'No Subject'}.txt",
-                            "binary": extracted_text.encode("utf-8"),
-                            "title": subject or "No Subject",
-                            "raw_text": extracted_text,
-                            "source_path": f"imap://{self.username}@{self.host}/{self.mailbox}/{uid}",
-                            "source_type": self.source_type,
-                            "user_metadata": {
-                                "subject": subject,
-                                "from": sender,
-                                "date": date_str,
-                                "uid": uid,
-                                "content_score": score,
-                                **self.user_metadata,
-                            },
-                        })
-
-                        # 附件文档
-                        for att in attachments:
-                            att_id = hashlib.sha256(
-                                (doc_id + att["file_name"]).encode('utf-8')
-                            ).hexdigest()[:16]
-                            items.append({
-                                "doc_id": att_id,
-                                "file_name": att["file_name"],
-                                "binary": att["binary"],
-                                "raw_text": None,
-                                "source_path": f"imap://{self.username}@{self.host}/{self.mailbox}/{uid}/attachment/{att['file_name']}",
-                                "source_type": f"{self.source_type}_attachment",
-                                "user_metadata": {
-                                    "subject": subject,
-                                    "from": sender,
-                                    "date": date_str,
-                                    "content_type": att["content_type"],
-                                    **self.user_metadata,
-                                },
-                            })
-
-                        logger.debug(f"Fetched UID {uid} | Subject: {subject[:50]}")
-                        return items
-
+                        # BODY.PEEK[] 不会把邮件标记为 \Seen
+                        fetch_resp = await client.uid("FETCH", uid_set, "(BODY.PEEK[])")
                     except Exception as e:
-                        logger.error(f"Error fetching UID {uid}: {e}")
+                        logger.error(f"Error fetching UIDs {uid_set}: {e}")
+                        return []
+                    if fetch_resp.result != "OK":
+                        logger.warning(f"UID {uid_set} fetch failed")
                         return []
 
-            # 并行抓取
-            tasks = [fetch_email(uid) for uid in uids]
-            batches = await asyncio.gather(*tasks, return_exceptions=False)
-
-            for batch in batches:
-                results.extend(batch)
-
-            # 按内容长度倒序
-            results.sort(
-                key=lambda x: x.get("user_metadata", {}).get("content_score", 0),
-                reverse=True,
-            )
+                # 解析（含正文抽取）属于 CPU 密集操作，放到进程池执行，与其它 FETCH 并行
+                loop = asyncio.get_running_loop()
+                pool = get_parse_pool()
+                parsed = await asyncio.gather(*[
+                    loop.run_in_executor(
+                        pool, _parse_one, uid, raw_email,
+                        self.username, self.host, self.mailbox, self.source_type, self.user_metadata,
+                    )
+                    for uid, raw_email in split_fetch_response(fetch_resp.lines)
+                    if raw_email
+                ], return_exceptions=True)
+                items: List[EmailItem] = []
+                for res in parsed:
+                    if isinstance(res, Exception):
+                        logger.error(f"Error parsing email in {uid_set}: {res}")
+                    else:
+                        items.extend(res)
+                return items
+
+            # 按 UID 区间批量抓取，每批 FETCH_CHUNK_SIZE 封（连续 UID 合并为 a:b）
+            chunks = [uids[i:i + FETCH_CHUNK_SIZE] for i in range(0, len(uids), FETCH_CHUNK_SIZE)]
+            # 哪批先完成就先并入结果，不必等全部完成后再合并一份 list-of-lists
+            for done in asyncio.as_completed([fetch_chunk(chunk) for chunk in chunks]):
+                results.extend(await done)
+
+            # 按内容长度倒序（原地排序，不再复制列表）
+            results.sort(key=attrgetter("content_score"), reverse=True)
 
             logger.info(f"Successfully fetched {len(results)} documents (including attachments).")
 
+        except Exception:
+            # 结果不会返回给 pipeline，已落盘的附件在此删除
+            for item in results:
+                remove_spilled(item.binary_path)
+            # 连接状态未知，丢弃后下次重连
+            await self._conn.reset()
+            raise
         finally:
-            # 兼容新旧所有版本 aioimaplib 的安全退出
-            try:
-                if client and hasattr(client, "protocol") and client.protocol:
-                    await asyncio.wait_for(client.logout(), timeout=10)
-            except Exception as e:
-                logger.debug(f"IMAP logout error (can be ignored): {e}")
-            finally:
-                try:
-                    await client.stop()
-                except:
-                    pass
-
-        return results
+            self._conn.release()
+
+        # 在 pipeline 边界转换成 dict
+        return [item.to_dict() for item in results]
 
     @staticmethod
     def _decode_header(val: Optional[str]) -> str:
         if not val:
             return ""
-        decoded = decode_header(val)
+        # 纯 ASCII 且不含编码字的头无需 decode_header
+        if isinstance(val, str) and val.isascii() and "=?" not in val:
+            return val
+        decoded_fragments = decode_header(val)
         parts = []
-        for frag, enc in decoded:
-            if isinstance(frag, bytes):
-                enc = enc or "utf-8"
-                try:
-                    parts.append(frag.decode(enc, errors="ignore"))
-                except:
-                    parts.append(frag.decode("utf-8", errors="ignore"))
+        for fragment, encoding in decoded_fragments:
+            if isinstance(fragment, bytes):
+                # errors="replace" 不会抛异常，一次解码即可，无需逐个字符集重试
+                parts.append(fragment.decode(codec_name(encoding), errors="replace"))
             else:
-                parts.append(str(frag))
-        return "".join(parts)
\ No newline at end of file
+                parts.append(fragment)
+        return "".join(parts)
+
+
+def _spill_attachment(filename: str, payload: bytes, content_type: str) -> Dict[str, Any]:
+    """附件内容直接落盘，结果里只带路径，避免整批附件字节跨进程传递并常驻内存"""
+    return {
+        "file_name": filename,
+        "binary_path": spill_to_tempfile(payload, suffix=os.path.splitext(filename)[1], prefix="email_att_"),
+        "content_length": len(payload),
+        "content_type": content_type,
+    }
+
+
+def _parse_fast(raw_email: bytes) -> Optional[Tuple[str, str, str, List[str], List[Dict[str, Any]]]]:
+    """
+    用 fast_mail_parser（Rust）解析；解析失败返回 None，由标准库兜底。
+    fast_mail_parser 只给出扁平的 text_plain / text_html 列表，无法区分 alternative 与 mixed：
+    两者同时存在且邮件含 multipart/alternative 时也返回 None，交给标准库按 MIME 结构取舍。
+    """
+    try:
+        pm = fast_parse_email(raw_email)
+    except Exception:
+        return None
+
+    plain_parts: List[str] = list(pm.text_plain or [])
+    html_parts: List[str] = list(pm.text_html or [])
+    if plain_parts and html_parts and has_alternative(raw_email):
+        return None
+    raw_text_parts = _join_body(plain_parts, html_parts)
+
+    attachments = [
+        _spill_attachment(att.filename or "unknown.bin", att.content, att.mimetype)
+        for att in pm.attachments or []
+        if att.content
+    ]
+    # headers 的值是列表（同名头可重复出现）
+    sender = (pm.headers or {}).get("From") or [""]
+    return pm.subject or "", pm.date or "", sender[0], raw_text_parts, attachments
+
+
+def _parse_stdlib(raw_email: bytes) -> Tuple[str, str, str, List[str], List[Dict[str, Any]]]:
+    msg = _EMAIL_PARSER.parsebytes(raw_email)
+
+    subject = EmailSourceFull._decode_header(msg.get("Subject", ""))
+    date_str = EmailSourceFull._decode_header(msg.get("Date", ""))
+    sender = EmailSourceFull._decode_header(msg.get("From", ""))
+
+    plain_parts: List[str] = []
+    html_parts: List[str] = []
+    attachments = []
+    skip_html = redundant_html_parts(msg)
+
+    try:
+        for part in msg.walk():
+            ctype = part.get_content_type()
+            disposition = part.get_content_disposition()
+
+            payload = part.get_payload(decode=True)
+            if not payload:
+                continue
+
+            if disposition == "attachment":
+                filename = EmailSourceFull._decode_header(part.get_filename()) or "unknown.bin"
+                attachments.append(_spill_attachment(filename, payload, ctype))
+            elif ctype in ("text/plain", "text/html") and id(part) not in skip_html:
+                # 按 MIME 声明的字符集一次解码（codec_name 对缺失/未知字符集回退 utf-8），
+                # 非法字节替换为 U+FFFD，而不是静默丢弃
+                text = payload.decode(codec_name(part.get_content_charset()), errors="replace")
+                (html_parts if ctype == "text/html" else plain_parts).append(text)
+    except Exception:
+        # 解析失败时这封邮件整体丢弃，已落盘的附件一并删除
+        for att in attachments:
+            remove_spilled(att["binary_path"])
+        raise
+
+    return subject, date_str, sender, _join_body(plain_parts, html_parts), attachments
+
+
+def _parse_one(uid: str, raw_email: bytes, username: str, host: str, mailbox: str,
+               source_type: str, user_metadata: Dict[str, Any]) -> List[EmailItem]:
+    """解析单封邮件，返回正文及附件 items（在解析进程池中执行，参数与返回值都需可 pickle）"""
+    parsed = _parse_fast(raw_email) if fast_parse_email is not None else None
+    if parsed is None:
+        parsed = _parse_stdlib(raw_email)
+    subject, date_str, sender, raw_text_parts, attachments = parsed
+
+    extracted_text = "\n".join(raw_text_parts).strip()
+    score = len(extracted_text)
+
+    # 主文档 ID
+    # 字段间以 \x1f（单元分隔符）拼接，避免字段边界不同却得到相同的 ID
+    doc_id = hashlib.blake2b(
+        b"\x1f".join([subject.encode('utf-8'), date_str.encode('utf-8'),
+                       sender.encode('utf-8'), uid.encode('ascii')]),
+        digest_size=8,
+    ).hexdigest()
+
+    items: List[EmailItem] = []
+
+    # 正文文档
+    items.append(EmailItem(
+        doc_id=doc_id,
+        file_name=f"{subject or 'No Subject'}.txt",
+        binary=extracted_text.encode("utf-8"),
+        title=subject or "No Subject",
+        raw_text=extracted_text,
+        source_path=f"imap://{username}@{host}/{mailbox}/{uid}",
+        source_type=source_type,
+        user_metadata={
+            "subject": subject,
+            "from": sender,
+            "date": date_str,
+            "uid": uid,
+            "content_score": score,
+            **user_metadata,
+        },
+        content_score=score,
+    ))
+
+    # 附件文档
+    for att in attachments:
+        att_id = hashlib.blake2b(
+            b"\x1f".join([doc_id.encode('ascii'), att["file_name"].encode('utf-8')]), digest_size=8
+        ).hexdigest()
+        items.append(EmailItem(
+            doc_id=att_id,
+            file_name=att["file_name"],
+            binary=None,
+            binary_path=att["binary_path"],
+            content_length=att["content_length"],
+            raw_text=None,
+            source_path=f"imap://{username}@{host}/{mailbox}/{uid}/attachment/{att['file_name']}",
+            source_type=f"{source_type}_attachment",
+            user_metadata={
+                "subject": subject,
+                "from": sender,
+                "date": date_str,
+                "content_type": att["content_type"],
+                **user_metadata,
+            },
+        ))
+
+    logger.debug(f"Fetched UID {uid} | Subject: {subject[:50]}")
+    return items
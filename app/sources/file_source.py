@@ -4,6 +4,8 @@ from app.sources.base import BaseSource
 
 
 class FileSource(BaseSource):
+    __slots__ = ("filename", "content", "user_metadata")
+
     def __init__(self, filename: str, content: bytes):
         self.user_metadata = None
         self.filename = filename
@@ -0,0 +1,244 @@
+# app/sources/imap_connection.py
+import asyncio
+import codecs
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from email.message import Message
+from typing import Any, Awaitable, Iterable, List, Optional, Set, Tuple
+
+import aioimaplib
+
+from app.utility.log import logger
+
+# 单次 UID FETCH 的最大邮件数，避免超出服务器输出缓冲
+FETCH_CHUNK_SIZE = 100
+
+_FETCH_LITERAL_RE = re.compile(rb"FETCH \(.*\{\d+\}\s*$")
+# 原始邮件中是否出现 multipart/alternative（Content-Type 大小写不敏感）
+_ALTERNATIVE_RE = re.compile(rb"multipart/alternative", re.IGNORECASE)
+_UID_RE = re.compile(rb"UID\s+(\d+)")
+
+# 邮件解析进程池（懒创建、进程内所有 EmailSource 共享）
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """
+    MIME 解析 + 正文抽取是纯 CPU 操作，放到进程池里才能真正并行（线程受 GIL 限制）。
+    使用 spawn，避免在多线程的服务进程里 fork。
+    """
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                _parse_pool = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _parse_pool
+
+# 邮件头里常见的伪字符集，按 utf-8 处理
+_IGNORED_HEADER_CHARSETS = frozenset(["unknown-8bit", "8bit", "binary", "default", "none"])
+
+
+@lru_cache(maxsize=128)
+def codec_name(charset: Optional[str]) -> str:
+    """把邮件声明的字符集规范化为 Python codec 名（带缓存）；缺失、伪字符集或未知字符集一律按 utf-8"""
+    if not charset or charset.lower() in _IGNORED_HEADER_CHARSETS:
+        return "utf-8"
+    try:
+        return codecs.lookup(charset).name
+    except LookupError:
+        return "utf-8"
+
+
+def has_alternative(raw_email: bytes) -> bool:
+    """原始邮件是否含 multipart/alternative 结构（不解析 MIME，直接在字节上查找）"""
+    return _ALTERNATIVE_RE.search(raw_email) is not None
+
+
+def redundant_html_parts(msg: Message) -> Set[int]:
+    """
+    返回应跳过的 text/html 部分（以 id(part) 标识）：
+    同一个 multipart/alternative 下已有 text/plain 分支时，其它分支里的 HTML 只是同一正文的另一种形式，
+    计入会造成正文重复。不在 alternative 中的 HTML（如 multipart/mixed 里的独立正文）不受影响。
+    """
+    skip: Set[int] = set()
+    for part in msg.walk():
+        if part.get_content_type() != "multipart/alternative":
+            continue
+        children = part.get_payload()
+        if not isinstance(children, list):
+            continue
+        if not any(c.get_content_type() == "text/plain" and c.get_content_disposition() != "attachment"
+                   for c in children):
+            continue
+        for child in children:
+            for sub in child.walk():
+                if sub.get_content_type() == "text/html":
+                    skip.add(id(sub))
+    return skip
+
+
+def compress_uid_set(uids: Iterable[int]) -> str:
+    """
+    把升序 UID 列表压缩成 IMAP sequence set，连续的 UID 合并为区间：
+    [1, 2, 3, 7, 9, 10] -> "1:3,7,9:10"
+    """
+    parts: List[str] = []
+    start = prev = None
+    for uid in uids:
+        if prev is not None and uid == prev + 1:
+            prev = uid
+            continue
+        if start is not None:
+            parts.append(f"{start}:{prev}" if prev != start else str(start))
+        start = prev = uid
+    if start is not None:
+        parts.append(f"{start}:{prev}" if prev != start else str(start))
+    return ",".join(parts)
+
+
+def split_fetch_response(lines) -> List[Tuple[str, bytes]]:
+    """
+    把批量 UID FETCH 的响应拆成 [(uid, 原始邮件字节)]。
+    aioimaplib 的响应形如：b'12 FETCH (UID 345 BODY[] {1024}'、邮件字面量、b')' ...
+    UID 可能在字面量之前，也可能在其后的收尾行里。
+    """
+    messages: List[Tuple[str, bytes]] = []
+    i, n = 0, len(lines)
+    while i < n:
+        line = lines[i]
+        if i + 1 < n and _FETCH_LITERAL_RE.search(line):
+            m = _UID_RE.search(line)
+            if m is None and i + 2 < n:
+                m = _UID_RE.search(lines[i + 2])
+            if m is not None:
+                messages.append((m.group(1).decode(), bytes(lines[i + 1])))
+            else:
+                logger.warning(f"Email fetch: UID missing in response line {line[:80]!r}")
+            i += 2
+            continue
+        i += 1
+    return messages
+
+
+class ImapConnection:
+    """
+    持久化的 IMAP 连接，供 EmailSource / EmailSourceFull 在多次 read() 之间复用。
+    - aioimaplib 客户端绑定在创建它的事件循环上，因此连接自带一个长期存在的事件循环。
+    - 每次使用前发送 NOOP 检查连接是否存活，失效时才重新 TLS + LOGIN + SELECT。
+    - 空闲超过 MAX_IDLE_SECONDS（低于常见服务器约 30 分钟的空闲断开）时主动重连。
+    """
+
+    MAX_IDLE_SECONDS = 28 * 60
+    NOOP_TIMEOUT = 5
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 use_ssl: bool = True, timeout: Optional[float] = None):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+
+        self._loop = asyncio.new_event_loop()
+        self._lock = threading.Lock()
+        self._client = None
+        self._mailbox: Optional[str] = None
+        self._idle_since = 0.0
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """在连接自己的事件循环上同步执行协程（同一连接的调用串行化）"""
+        with self._lock:
+            return self._loop.run_until_complete(coro)
+
+    async def acquire(self, mailbox: str):
+        """返回已登录并选中 mailbox 的客户端；失败时返回 None"""
+        if self._client is not None:
+            if time.monotonic() - self._idle_since > self.MAX_IDLE_SECONDS:
+                logger.info("IMAP connection idle too long, reconnecting")
+                await self.reset()
+            elif not await self._alive():
+                logger.info("IMAP connection lost, reconnecting")
+                await self.reset()
+
+        if self._client is None:
+            if not await self._connect():
+                return None
+
+        if self._mailbox != mailbox:
+            select_resp = await self._client.select(mailbox)
+            if select_resp.result != "OK":
+                logger.error(f"IMAP select mailbox {mailbox} failed: {select_resp.lines}")
+                return None
+            self._mailbox = mailbox
+
+        return self._client
+
+    def release(self) -> None:
+        """一次读取结束，记录空闲起点"""
+        self._idle_since = time.monotonic()
+
+    async def _alive(self) -> bool:
+        try:
+            resp = await asyncio.wait_for(self._client.noop(), self.NOOP_TIMEOUT)
+            return resp.result == "OK"
+        except Exception:
+            return False
+
+    async def _connect(self) -> bool:
+        kwargs = {"timeout": self.timeout} if self.timeout else {}
+        client = (aioimaplib.IMAP4_SSL(self.host, self.port, **kwargs) if self.use_ssl
+                  else aioimaplib.IMAP4(self.host, self.port, **kwargs))
+        try:
+            await client.wait_hello_from_server()
+            login_resp = await client.login(self.username, self.password)
+        except Exception as e:
+            logger.error(f"IMAP connect to {self.host}:{self.port} failed: {e}")
+            await self._shutdown(client)
+            return False
+        if login_resp.result != "OK":
+            logger.error(f"IMAP login failed: {login_resp.lines}")
+            await self._shutdown(client)
+            return False
+
+        self._client = client
+        self._mailbox = None
+        self._idle_since = time.monotonic()
+        return True
+
+    async def reset(self) -> None:
+        """丢弃当前连接（读取出错后调用，下次 acquire 时重连）"""
+        client, self._client, self._mailbox = self._client, None, None
+        if client is not None:
+            await self._shutdown(client)
+
+    @staticmethod
+    async def _shutdown(client) -> None:
+        # 兼容新旧所有版本 aioimaplib 的安全退出
+        try:
+            if hasattr(client, "protocol") and client.protocol:
+                await asyncio.wait_for(client.logout(), timeout=10)
+        except Exception as e:
+            logger.debug(f"IMAP logout error (can be ignored): {e}")
+        finally:
+            try:
+                await client.stop()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        """登出并关闭事件循环，实例之后不可再用"""
+        with self._lock:
+            if self._loop.is_closed():
+                return
+            self._loop.run_until_complete(self.reset())
+            self._loop.close()
@@ -4,6 +4,8 @@ from app.sources.base import BaseSource
 
 
 class TextSource(BaseSource):
+    __slots__ = ("text", "filename", "user_metadata")
+
     def __init__(self, text: str, filename: str = "text_input.txt"):
         self.user_metadata = None
         self.text = text
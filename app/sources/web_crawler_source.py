@@ -1,15 +1,65 @@
 # app/sources/web_crawler_source.py
 import asyncio
+import hashlib
+import logging
+import multiprocessing
 import os
 import re
-from typing import Dict, Any, Optional, List, Set
-from urllib.parse import urljoin, urlparse, urldefrag
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Set, Tuple
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, urldefrag, parse_qsl, urlencode
 
 import aiohttp
+import lxml.html
 import trafilatura
 from bs4 import BeautifulSoup
 from urllib import robotparser
 
+# 可选：可扩展布隆过滤器做 URL 去重（未安装时退回普通 set）
+try:
+    from pybloom_live import ScalableBloomFilter
+except ImportError:
+    ScalableBloomFilter = None
+
+# 可选：tldextract 按公共后缀表计算注册域名（正确处理 .co.uk / .com.cn 等）；
+# 使用包内自带的后缀表快照，不联网、不写缓存目录
+try:
+    import tldextract
+    _TLD_EXTRACT = tldextract.TLDExtract(cache_dir=None, suffix_list_urls=())
+except ImportError:
+    _TLD_EXTRACT = None
+
+# 可选：selectolax（lexbor C 解析器）做 HTML -> 文本与链接抽取，比 trafilatura / BeautifulSoup 快一个数量级
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# 可选：aiodns（c-ares 非阻塞 DNS），未安装时 aiohttp 使用线程池解析
+try:
+    import aiodns  # noqa: F401
+    _HAS_AIODNS = True
+except ImportError:
+    _HAS_AIODNS = False
+
+# 可选：Redis（增量爬取时跨多次 read() / 多个 worker 共享已发现 URL）
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+# 可选：resiliparse（lexbor + 原生正文抽取），一次解析同时完成去模板正文抽取与链接抽取
+try:
+    from resiliparse.parse.html import HTMLTree
+    from resiliparse.extract.html2text import extract_plain_text
+except ImportError:
+    HTMLTree = None
+    extract_plain_text = None
+
 from app.sources.base import BaseSource
 from app.utility.log import logger
 
@@ -19,28 +69,288 @@ AD_TRACKING_PATTERNS = [
     "baidu.com", "analytics", "tracker", "tracking", "ads.", "ad.",
 ]
 
-COMMON_PAGE_EXTENSIONS = [".html", ".htm", ".php", ".aspx", ""]  # empty => no extension
+# 所有广告/追踪特征编译成一个正则，一次扫描完成匹配（IGNORECASE 省去 url.lower() 的拷贝）
+_AD_RE = re.compile("|".join(map(re.escape, AD_TRACKING_PATTERNS)), re.IGNORECASE)
+
+COMMON_PAGE_EXTENSIONS = frozenset((".html", ".htm", ".php", ".aspx", ""))  # empty => no extension
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# URL 去重参数：布隆过滤器初始容量 / 误判率，以及精确匹配的最近 URL 数
+SEEN_URLS_CAPACITY = 100_000
+SEEN_URLS_ERROR_RATE = 1e-4
+SEEN_URLS_RECENT = 10_000
+
+# robots.txt 按主机缓存的有效期（秒），以及读取的最大字节数（Google 规范上限 500 KiB）
+ROBOTS_TTL = 6 * 3600
+ROBOTS_MAX_BYTES = 500 * 1024
+
+# 单个主机同时在抓取的页面数上限（全局上限由 concurrency 控制），避免集中压垮一个站点
+HOST_CONCURRENCY = 2
+
+# 每抓取多少个 URL 输出一条 Fetching 日志（第 1 个总会输出）
+FETCH_LOG_EVERY = 50
+
+# 增量爬取时已成功抓取的 URL 在多长时间内（秒）不再重复抓取
+CRAWL_FETCHED_TTL = 7 * 24 * 3600
+
+# 单个响应体的默认大小上限（字节），以及流式读取的块大小
+MAX_RESPONSE_BYTES = 50 * 1024 * 1024
+RESPONSE_CHUNK_SIZE = 64 * 1024
 
 
 def _normalize_url(url: str) -> str:
-    """标准化：去 fragment，去尾部斜杠（保留根 /），转换为 utf-8 safe"""
+    """
+    标准化：去 fragment，scheme/host 转小写，去掉默认端口，查询参数排序，去尾部斜杠。
+    同一页面的不同写法归一成同一个 URL，去重更准确。
+    结果只用作去重键（seen/visited），实际抓取仍使用原始 URL（如 "?print" 不会被改写成 "?print="）。
+    """
     url, _ = urldefrag(url)
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        netloc = (parts.hostname or "").lower()
+        if ":" in netloc:
+            # IPv6 地址：hostname 不带方括号，需补回
+            netloc = f"[{netloc}]"
+        if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+            netloc = f"{netloc}:{parts.port}"
+        if parts.username:
+            netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True))) if parts.query else ""
+        url = urlunsplit((scheme, netloc, parts.path, query, ""))
+    except ValueError:
+        # 非法端口等：保持原样，只做基础处理
+        pass
     return url.rstrip("/")
 
 
+# HTML 解析进程池（懒创建、进程内所有 WebCrawlerSource 共享）
+_html_pool: Optional[ProcessPoolExecutor] = None
+_html_pool_lock = threading.Lock()
+
+
+def _get_html_pool() -> ProcessPoolExecutor:
+    """HTML 解析与正文抽取受 GIL 限制，放到进程池才能多核并行；使用 spawn，避免在多线程的服务进程里 fork"""
+    global _html_pool
+    if _html_pool is None:
+        with _html_pool_lock:
+            if _html_pool is None:
+                _html_pool = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _html_pool
+
+
+def _parse_html(content: bytes, charset: Optional[str], url: str,
+                favor_precision: bool, extract_links: bool) -> Tuple[str, Dict[str, str]]:
+    """
+    解析单个 HTML 页面（在解析进程池中执行，参数与返回值都需可 pickle）。
+    返回 (正文, 候选链接)；候选链接为 {标准化去重键: 绝对 URL（去 fragment）}，按标准化结果页内去重（保持出现顺序）。
+    页面只解码一次、至多解析一次，正文抽取与链接抽取共用同一棵树。
+    """
+    try:
+        html_str = content.decode(charset or "utf-8", errors="ignore")
+    except LookupError:
+        html_str = content.decode("utf-8", errors="ignore")
+
+    soup = None
+    text = None
+    hrefs: Optional[List[str]] = None
+    absolute = False  # hrefs 是否已是绝对 URL
+    if HTMLTree is not None and not favor_precision:
+        # 快速路径：resiliparse 抽取主体正文（去掉导航、页脚等模板内容），链接取自同一棵树
+        tree = HTMLTree.parse(html_str)
+        text = extract_plain_text(tree, main_content=True, alt_texts=False)
+        hrefs = [a.getattr("href") or "" for a in tree.document.query_selector_all("a[href]")]
+    elif LexborHTMLParser is not None and not favor_precision:
+        # 次选：selectolax 直接取 body 文本（去掉脚本/样式）
+        tree = LexborHTMLParser(html_str)
+        tree.strip_tags(["script", "style", "noscript"])
+        node = tree.body or tree.root
+        text = node.text(separator="\n", strip=True) if node is not None else ""
+        hrefs = [a.attributes.get("href") or "" for a in tree.css("a[href]")]
+    else:
+        tree = None
+        if extract_links:
+            try:
+                # lxml 在 C 层遍历链接，make_links_absolute 一次性转绝对 URL（并处理 <base href>），省去逐个 urljoin；
+                # 链接须在交给 trafilatura 之前取出（trafilatura 会就地裁剪这棵树）
+                tree = lxml.html.fromstring(html_str, base_url=url)
+                tree.make_links_absolute(url, resolve_base_href=True, handle_failures="discard")
+                hrefs = [link for el, attr, link, _ in tree.iterlinks() if attr == "href" and el.tag == "a"]
+                absolute = True
+            except Exception as e:
+                # 如带编码声明的 XHTML，lxml 不接受 str 输入，退回下面的 BeautifulSoup
+                logger.debug("[WebCrawlerSource] lxml link extraction failed for %s: %s", url, e)
+                tree = None
+        try:
+            # 优先用 trafilatura 提取正文（比简单 soup 更稳健），已解析过的树直接复用
+            text = trafilatura.extract(tree if tree is not None else html_str,
+                                       include_comments=False, favor_precision=True)
+        except Exception as e:
+            logger.debug("[WebCrawlerSource] HTML parsing error for %s: %s", url, e)
+        if not text:
+            # fallback to BeautifulSoup（lxml 解析器，比 html.parser 快数倍）
+            soup = BeautifulSoup(html_str, "lxml")
+            text = soup.get_text(separator="\n", strip=True)
+
+    if not extract_links:
+        return text or "", {}
+
+    try:
+        if hrefs is None:
+            if soup is None:
+                soup = BeautifulSoup(html_str, "lxml")
+            hrefs = [a["href"] for a in soup.find_all("a", href=True)]
+        if not absolute:
+            hrefs = [urljoin(url, href) for href in hrefs]
+        candidates: Dict[str, str] = {}
+        for href in hrefs:
+            candidates.setdefault(_normalize_url(href), urldefrag(href)[0])
+    except Exception as e:
+        logger.debug("[WebCrawlerSource] Link extraction error for %s: %s", url, e)
+        candidates = {}
+    return text or "", candidates
+
+
+class _SeenUrls:
+    """
+    已发现 URL 的去重集合。
+    - 安装了 pybloom_live 时使用可扩展布隆过滤器，每个 URL 约 1~2 字节（允许极小概率误判为已见过而跳过）；
+      否则退回普通 set。
+    - 最近加入的 SEEN_URLS_RECENT 个 URL 另存一份精确集合，热点链接（导航栏等）直接命中，不必再算哈希。
+    """
+
+    def __init__(self):
+        self._recent: deque = deque(maxlen=SEEN_URLS_RECENT)
+        self._recent_set: Set[str] = set()
+        self.clear()
+
+    def clear(self) -> None:
+        self._recent.clear()
+        self._recent_set.clear()
+        if ScalableBloomFilter is not None:
+            self._all = ScalableBloomFilter(initial_capacity=SEEN_URLS_CAPACITY, error_rate=SEEN_URLS_ERROR_RATE)
+        else:
+            self._all = set()
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._recent_set or url in self._all
+
+    def add(self, url: str) -> bool:
+        """
+        检查并加入（一次完成），返回该 URL 此前是否未见过。
+        布隆过滤器的 add 本身就返回"是否已存在"；set 则用长度变化判断，都不必先单独查一次。
+        """
+        if url in self._recent_set:
+            return False
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(url)
+        self._recent_set.add(url)
+        if ScalableBloomFilter is not None:
+            return not self._all.add(url)
+        before = len(self._all)
+        self._all.add(url)
+        return len(self._all) != before
+
+    def update(self, urls: List[str]) -> None:
+        for url in urls:
+            self.add(url)
+
+    async def add_new(self, urls: List[str]) -> List[str]:
+        """加入一批 URL，返回其中此前未见过的部分"""
+        return [url for url in urls if self.add(url)]
+
+
+class _RedisFetchedUrls:
+    """
+    Redis 中已成功抓取的 URL 记录，供增量爬取使用：跨多次 read() 保留，多个 worker 共享。
+    用有序集合保存"URL -> 抓取时间"，每个 URL 各自在 CRAWL_FETCHED_TTL 后过期，到期后重新抓取。
+    只在页面抓取成功后才写入：失败、被 robots.txt 拒绝或中途取消的 URL 下次爬取仍会重试。
+    Redis 不可用时不做跨次过滤（本次爬取内的去重始终由本地 _SeenUrls 完成）。
+    """
+
+    def __init__(self, client, key: str):
+        self._client = client
+        self._key = key
+
+    async def prune(self) -> None:
+        """删除已过期的记录"""
+        try:
+            await self._client.zremrangebyscore(self._key, "-inf", time.time() - CRAWL_FETCHED_TTL)
+        except Exception as e:
+            logger.warning("[WebCrawlerSource] Redis fetched-set unavailable: %s", e)
+
+    async def filter_new(self, urls: List[str]) -> List[str]:
+        """返回其中最近 CRAWL_FETCHED_TTL 内没有成功抓取过的 URL（一次 pipeline 批量查询）"""
+        if not urls:
+            return []
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for url in urls:
+                    pipe.zscore(self._key, url)
+                scores = await pipe.execute()
+        except Exception as e:
+            logger.warning("[WebCrawlerSource] Redis fetched-set unavailable, not filtering: %s", e)
+            return urls
+        cutoff = time.time() - CRAWL_FETCHED_TTL
+        return [url for url, fetched_at in zip(urls, scores) if fetched_at is None or fetched_at < cutoff]
+
+    async def mark(self, url: str) -> None:
+        """记录 URL 已成功抓取"""
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.zadd(self._key, {url: time.time()})
+                pipe.expire(self._key, CRAWL_FETCHED_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("[WebCrawlerSource] Failed to record fetched URL %s: %s", url, e)
+
+
 def _is_ad_link(url: str) -> bool:
-    lower = url.lower()
-    for p in AD_TRACKING_PATTERNS:
-        if p in lower:
-            return True
-    return False
+    return _AD_RE.search(url) is not None
 
 
 def _get_base_domain(netloc: str) -> str:
-    parts = netloc.split(".")
+    """
+    注册域名（如 www.bbc.co.uk -> bbc.co.uk）。安装了 tldextract 时按公共后缀表判断，
+    否则退回取最后两段；IP / localhost 等无注册域名时返回主机本身。
+    """
+    host = netloc.rsplit("@", 1)[-1].split(":", 1)[0]
+    if _TLD_EXTRACT is not None:
+        return _TLD_EXTRACT(host).registered_domain or host
+    parts = host.split(".")
     if len(parts) >= 2:
         return ".".join(parts[-2:])
-    return netloc
+    return host
+
+
+@lru_cache(maxsize=200_000)
+def _url_in_scope(url: str, start_netloc: str, start_base_domain: str, allow_subdomains: bool,
+                  restrict_to_path: bool, start_path_prefix: str) -> bool:
+    """WebCrawlerSource._is_url_in_scope 的实现（带缓存，同一 URL 不再重复 urlparse）"""
+    parsed = urlparse(url)
+    netloc = parsed.netloc.lower()
+    path = parsed.path or "/"
+
+    # 主机检查
+    if netloc == start_netloc:
+        pass
+    elif allow_subdomains and (parsed.hostname or "").endswith("." + start_base_domain):
+        pass
+    else:
+        return False
+
+    # 限定目录检查
+    if restrict_to_path:
+        # 例如 start_path_prefix = '/zt_d/subject-1744249144/'
+        if not path.startswith(start_path_prefix):
+            return False
+
+    return True
 
 
 class WebCrawlerSource(BaseSource):
@@ -53,6 +363,10 @@ class WebCrawlerSource(BaseSource):
     - allow_subdomains: 是否允许抓取子域（True：允许同根域的任意子域；False：只允许 start_url 的主机）
     - restrict_to_path: 是否限定到起始 URL 的目录（True：只抓取以 start_url.path 开头的 URL；False：不限定目录）
     - respect_robots: 是否遵守 robots.txt（True：会读取并判断 allow）
+    - max_bytes: 单个响应体的大小上限，超过则跳过（不再完整下载）
+    - incremental / redis_url: 增量爬取。成功抓取的 URL 记录在 Redis 中（按 start_url 区分，每个 URL 保留 CRAWL_FETCHED_TTL），
+      之后的 read() 跳过这段时间内已抓取过的链接；多个 worker 也共享同一份记录
+    - favor_precision: 是否用 trafilatura 精确抽取正文（False 时优先 resiliparse 抽取主体正文，其次 selectolax 取 body 文本）
     返回每个抓取到的条目为 dict:
     {
         "file_name": ...,
@@ -74,22 +388,34 @@ class WebCrawlerSource(BaseSource):
         allow_subdomains: bool = True,
         restrict_to_path: bool = False,
         respect_robots: bool = True,
+        favor_precision: bool = False,
+        max_bytes: int = MAX_RESPONSE_BYTES,
+        incremental: bool = False,
+        redis_url: Optional[str] = None,
     ):
         self.start_url = start_url.rstrip("/")
         self.max_depth = max_depth
-        self.allowed_extensions = [e.lower() for e in (allowed_extensions or [
+        # frozenset：每个 URL 都要做后缀判断，哈希查找比列表线性扫描快
+        self.allowed_extensions = frozenset(e.lower() for e in (allowed_extensions or [
             ".html", ".htm", ".pdf", ".txt", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx"
-        ])]
+        ]))
         self.concurrency = max(1, int(concurrency))
         self.user_metadata = None
         self.source_type = "web"
         self.allow_subdomains = allow_subdomains
         self.restrict_to_path = restrict_to_path
         self.respect_robots = respect_robots
+        self.favor_precision = favor_precision
+        self.max_bytes = max_bytes
+        self.incremental = incremental
+        self.redis_url = redis_url
+        self._fetched_key = f"crawl:fetched:{hashlib.md5(self.start_url.encode('utf-8')).hexdigest()}"
 
         # 内部状态（线程内）
         self.visited_urls: Set[str] = set()
-        self.seen_urls: Set[str] = set()  # 去重（标准化）
+        self.seen_urls = _SeenUrls()  # 本次爬取内的链接去重（标准化）
+        # 增量爬取时在 _crawl_async 中创建：跨次爬取的"已成功抓取"记录
+        self._fetched_store: Optional[_RedisFetchedUrls] = None
         self.results: List[Dict[str, Any]] = []
 
         # 解析起始 URL 信息
@@ -98,18 +424,15 @@ class WebCrawlerSource(BaseSource):
         self.start_base_domain = _get_base_domain(self.start_netloc)
         self.start_path_prefix = parsed.path if parsed.path.endswith("/") else os.path.dirname(parsed.path) + "/"
 
-        # robots parser（延迟加载）
-        self._robots = None
-        if self.respect_robots:
-            try:
-                rp = robotparser.RobotFileParser()
-                robots_url = f"{parsed.scheme}://{self.start_netloc}/robots.txt"
-                rp.set_url(robots_url)
-                rp.read()
-                self._robots = rp
-            except Exception as e:
-                logger.warning(f"[WebCrawlerSource] Failed to load robots.txt: {e}")
-                self._robots = None
+        # robots.txt 按主机缓存：host -> (parser 或 None, 抓取时间)；在爬取过程中用 aiohttp 异步加载
+        self._robots_cache: Dict[str, Tuple[Optional[robotparser.RobotFileParser], float]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+
+        # 每次爬取时在 _crawl_async 中重建：全局/按主机的并发限制，以及仍在进行的抓取任务
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._fetch_count = 0
 
     # -------------------------
     # 外部同步接口（Pipeline 调用）
@@ -147,125 +470,171 @@ class WebCrawlerSource(BaseSource):
     # 异步核心爬取逻辑
     # -------------------------
     async def _crawl_async(self):
-        connector = aiohttp.TCPConnector(ssl=False)  # 根据需要调整
+        # 连接池与并发上限一致；同主机最多 4 条连接；DNS 结果缓存 5 分钟（有 aiodns 时异步解析）
+        resolver = aiohttp.AsyncResolver() if _HAS_AIODNS else None
+        connector = aiohttp.TCPConnector(ssl=False, limit=self.concurrency, limit_per_host=4,
+                                         use_dns_cache=True, ttl_dns_cache=300, resolver=resolver)
         timeout = aiohttp.ClientTimeout(total=30)
-        sem = asyncio.Semaphore(self.concurrency)
+        self._global_sem = asyncio.Semaphore(self.concurrency)
+        self._host_sems = defaultdict(lambda: asyncio.Semaphore(HOST_CONCURRENCY))
+        self._tasks = set()
+        self._fetch_count = 0
+        redis_client = None
+        self._fetched_store = None
+        if self.incremental and self.redis_url:
+            if aioredis is None:
+                logger.warning("[WebCrawlerSource] redis not installed, incremental crawl disabled")
+            else:
+                redis_client = aioredis.Redis.from_url(self.redis_url)
+                self._fetched_store = _RedisFetchedUrls(redis_client, self._fetched_key)
+                await self._fetched_store.prune()
+        try:
+            await self._crawl_with_session(connector, timeout)
+        finally:
+            self._fetched_store = None
+            if redis_client is not None:
+                await redis_client.aclose()
+
+    async def _crawl_with_session(self, connector: aiohttp.TCPConnector, timeout: aiohttp.ClientTimeout):
         async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            # 使用队列进行 BFS 风格抓取（更易控制深度）
-            queue = asyncio.Queue()
-            start_url_norm = _normalize_url(self.start_url)
-            await queue.put((start_url_norm, 0))
-
-            workers = [asyncio.create_task(self._worker(queue, session, sem)) for _ in range(self.concurrency)]
-            await queue.join()
-            for w in workers:
-                w.cancel()
-            await asyncio.gather(*workers, return_exceptions=True)
-
-    async def _worker(self, queue: asyncio.Queue, session: aiohttp.ClientSession, sem: asyncio.Semaphore):
-        while True:
-            try:
-                url, depth = await queue.get()
-            except asyncio.CancelledError:
+            # 每个 URL 一个任务，由信号量限流：慢主机只占用自己的名额，不会拖住固定数量的 worker
+            self._schedule(self.start_url, _normalize_url(self.start_url), 0, session)
+            while self._tasks:
+                await asyncio.wait(set(self._tasks))
+
+    def _schedule(self, url: str, key: str, depth: int, session: aiohttp.ClientSession) -> None:
+        """url 为实际抓取的地址，key 为其标准化形式（去重键）"""
+        task = asyncio.create_task(self._process(url, key, depth, session))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, url: str, key: str, depth: int, session: aiohttp.ClientSession):
+        try:
+            if key in self.visited_urls:
                 return
-            try:
-                if url in self.visited_urls:
-                    continue
-                # 1) robots.txt 检查
-                if self._is_disallowed_by_robots(url):
-                    logger.debug(f"[WebCrawlerSource] Disallowed by robots.txt: {url}")
-                    self.visited_urls.add(url)
-                    continue
-                # 2) 广告/追踪过滤
+            # 标记访问（防重复抓取）
+            self.visited_urls.add(key)
+            # 1) robots.txt 检查
+            if await self._is_disallowed_by_robots(url, session):
+                logger.debug("[WebCrawlerSource] Disallowed by robots.txt: %s", url)
+                return
+            # 2) 广告/追踪过滤 + 3) 同域名 / 子域 / 同目录 检查
+            # 页面内发现的链接在入队前已批量过滤过，这里只需检查起始 URL
+            if depth == 0:
                 if _is_ad_link(url):
-                    logger.debug(f"[WebCrawlerSource] Skipping ad/tracking link: {url}")
-                    self.visited_urls.add(url)
-                    continue
-                # 3) 同域名 / 子域 / 同目录 检查
+                    logger.debug("[WebCrawlerSource] Skipping ad/tracking link: %s", url)
+                    return
                 if not self._is_url_in_scope(url):
-                    logger.debug(f"[WebCrawlerSource] Out-of-scope URL: {url}")
-                    self.visited_urls.add(url)
-                    continue
+                    logger.debug("[WebCrawlerSource] Out-of-scope URL: %s", url)
+                    return
 
-                # 标记访问（防重复排队）
-                self.visited_urls.add(url)
+            host = urlparse(url).netloc.lower()
+            # 先取主机名额再取全局名额：排队等某个繁忙主机的任务不占用全局名额，其他主机不会被饿死
+            async with self._host_sems[host], self._global_sem:
+                fetched = await self._fetch_and_process(url, depth, session)
+            # 只有成功抓取的 URL 才记入跨次记录，失败的下次增量爬取仍会重试
+            if fetched and self._fetched_store is not None:
+                await self._fetched_store.mark(key)
+        except Exception as e:
+            logger.error("[WebCrawlerSource] Worker exception for %s: %s", url, e, exc_info=True)
 
-                async with sem:
-                    await self._fetch_and_process(url, depth, queue, session)
-            except Exception as e:
-                logger.error(f"[WebCrawlerSource] Worker exception for {url}: {e}", exc_info=True)
-            finally:
-                try:
-                    queue.task_done()
-                except Exception:
-                    pass
-
-    def _is_disallowed_by_robots(self, url: str) -> bool:
-        if not self._robots:
+    async def _is_disallowed_by_robots(self, url: str, session: aiohttp.ClientSession) -> bool:
+        if not self.respect_robots:
+            return False
+        parsed = urlparse(url)
+        robots = await self._get_robots(parsed.scheme, parsed.netloc.lower(), session)
+        if robots is None:
             return False
         try:
-            return not self._robots.can_fetch("*", url)
+            return not robots.can_fetch("*", url)
         except Exception:
             return False
 
+    async def _get_robots(self, scheme: str, host: str,
+                          session: aiohttp.ClientSession) -> Optional[robotparser.RobotFileParser]:
+        """
+        获取主机的 robots.txt 解析器（缓存 ROBOTS_TTL 秒）。返回 None 表示不限制。
+        同一主机的并发请求只会触发一次下载。
+        """
+        cached = self._robots_cache.get(host)
+        if cached and time.monotonic() - cached[1] < ROBOTS_TTL:
+            return cached[0]
+
+        async with self._robots_locks.setdefault(host, asyncio.Lock()):
+            cached = self._robots_cache.get(host)
+            if cached and time.monotonic() - cached[1] < ROBOTS_TTL:
+                return cached[0]
+
+            rp: Optional[robotparser.RobotFileParser] = None
+            try:
+                async with session.get(f"{scheme}://{host}/robots.txt", allow_redirects=True) as resp:
+                    if resp.status in (401, 403):
+                        # 与 urllib.robotparser 一致：无权限读取 robots.txt 时视为全部禁止
+                        rp = robotparser.RobotFileParser()
+                        rp.disallow_all = True
+                    elif resp.status == 200:
+                        # content.read(n) 只返回当前已缓冲的数据，分块到达时会截断；逐块读到 EOF 或上限为止
+                        body = bytearray()
+                        async for chunk in resp.content.iter_chunked(RESPONSE_CHUNK_SIZE):
+                            body += chunk
+                            if len(body) >= ROBOTS_MAX_BYTES:
+                                del body[ROBOTS_MAX_BYTES:]
+                                break
+                        rp = robotparser.RobotFileParser()
+                        rp.parse(body.decode("utf-8", errors="ignore").splitlines())
+            except Exception as e:
+                logger.warning("[WebCrawlerSource] Failed to load robots.txt for %s: %s", host, e)
+
+            self._robots_cache[host] = (rp, time.monotonic())
+            return rp
+
     def _is_url_in_scope(self, url: str) -> bool:
         """
         判断是否在允许的抓取范围：
         - host 必须与 start_netloc 相同，或者以 start_base_domain 结尾（如果 allow_subdomains True）
         - 如果 restrict_to_path True，则 path 必须以 start_path_prefix 开头（限定目录）
         """
-        parsed = urlparse(url)
-        netloc = parsed.netloc.lower()
-        path = parsed.path or "/"
-
-        # 主机检查
-        if netloc == self.start_netloc:
-            pass
-        elif self.allow_subdomains and netloc.endswith("." + self.start_base_domain):
-            pass
-        else:
-            return False
-
-        # 限定目录检查
-        if self.restrict_to_path:
-            # 例如 start_path_prefix = '/zt_d/subject-1744249144/'
-            if not path.startswith(self.start_path_prefix):
-                return False
-
-        return True
-
-    async def _fetch_and_process(self, url: str, depth: int, queue: asyncio.Queue, session: aiohttp.ClientSession):
-        logger.info(f"[WebCrawlerSource] Fetching ({depth}): {url}")
+        return _url_in_scope(url, self.start_netloc, self.start_base_domain, self.allow_subdomains,
+                             self.restrict_to_path, self.start_path_prefix)
+
+    async def _fetch_and_process(self, url: str, depth: int, session: aiohttp.ClientSession) -> bool:
+        """抓取并处理单个 URL；成功产出结果时返回 True"""
+        # 抓取日志按 FETCH_LOG_EVERY 抽样输出，避免大规模爬取时每个 URL 都格式化并写一行 INFO
+        self._fetch_count += 1
+        if self._fetch_count % FETCH_LOG_EVERY == 1 and logger.isEnabledFor(logging.INFO):
+            logger.info("[WebCrawlerSource] Fetching (%d, #%d): %s", depth, self._fetch_count, url)
         try:
             async with session.get(url, allow_redirects=True) as resp:
                 status = resp.status
                 if status != 200:
-                    logger.debug(f"[WebCrawlerSource] Non-200 status {status} for {url}")
-                    return
+                    logger.debug("[WebCrawlerSource] Non-200 status %s for %s", status, url)
+                    return False
 
                 content_type = resp.headers.get("Content-Type", "").lower()
-                content = await resp.read()
 
-                # 判断资源类型（优先做扩展名判断）
+                # 判断资源类型（优先做扩展名判断）—— 在读取响应体之前完成，不需要的资源不下载
                 parsed = urlparse(url)
                 file_name = os.path.basename(parsed.path) or "index.html"
                 ext = os.path.splitext(file_name)[1].lower()
+                is_html = "text/html" in content_type or ext in COMMON_PAGE_EXTENSIONS
+                if not is_html and not (ext in self.allowed_extensions or "application/pdf" in content_type
+                                        or "application/octet-stream" in content_type):
+                    logger.debug("[WebCrawlerSource] Skipped content-type %s for %s", content_type, url)
+                    resp.release()
+                    return False
+
+                content = await self._read_body(resp, url)
+                if content is None:
+                    return False
 
                 # HTML 页面
-                if "text/html" in content_type or ext in COMMON_PAGE_EXTENSIONS:
-                    text = None
-                    try:
-                        # 优先用 trafilatura 提取正文（比简单 soup 更稳健）
-                        # trafilatura.extract 接受 bytes 或 str
-                        text = trafilatura.extract(content.decode(resp.get_encoding() or "utf-8", errors="ignore"), include_comments=False, favor_precision=True)
-                        if not text:
-                            # fallback to BeautifulSoup
-                            soup = BeautifulSoup(content, "html.parser")
-                            text = soup.get_text(separator="\n", strip=True)
-                    except Exception as e:
-                        logger.debug(f"[WebCrawlerSource] HTML parsing error for {url}: {e}")
-                        soup = BeautifulSoup(content, "html.parser")
-                        text = soup.get_text(separator="\n", strip=True)
+                if is_html:
+                    # 解析 + 正文抽取是纯 CPU 操作，放到进程池执行，事件循环继续处理其它页面的网络 I/O
+                    loop = asyncio.get_running_loop()
+                    text, candidates = await loop.run_in_executor(
+                        _get_html_pool(), _parse_html,
+                        content, resp.charset, url, self.favor_precision, depth < self.max_depth,
+                    )
 
                     score = self._score_text(text or "", content)
                     self.results.append({
@@ -279,27 +648,24 @@ class WebCrawlerSource(BaseSource):
                     })
 
                     # 递归：发现链接并加入队列（仅当 depth < max_depth）
-                    if depth < self.max_depth:
+                    if candidates:
                         try:
-                            soup = BeautifulSoup(content, "html.parser")
-                            for link in soup.find_all("a", href=True):
-                                href = link["href"]
-                                abs_url = urljoin(url, href)
-                                abs_url = _normalize_url(abs_url)
-                                if abs_url in self.seen_urls:
-                                    continue
-                                if _is_ad_link(abs_url):
-                                    continue
-                                # 仅当在 scope 内才放入队列
-                                if not self._is_url_in_scope(abs_url):
-                                    continue
-                                self.seen_urls.add(abs_url)
-                                await queue.put((abs_url, depth + 1))
+                            # 先过滤广告 / scope 外链接，再由 add_new 一次完成"是否见过"的检查与登记
+                            links = {
+                                key: u for key, u in candidates.items()
+                                if not _is_ad_link(u) and self._is_url_in_scope(u)
+                            }
+                            new_keys = await self.seen_urls.add_new(list(links))
+                            if self._fetched_store is not None:
+                                # 增量爬取：跳过最近已成功抓取过的 URL
+                                new_keys = await self._fetched_store.filter_new(new_keys)
+                            for key in new_keys:
+                                self._schedule(links[key], key, depth + 1, session)
                         except Exception as e:
-                            logger.debug(f"[WebCrawlerSource] Link extraction error for {url}: {e}")
+                            logger.debug("[WebCrawlerSource] Link extraction error for %s: %s", url, e)
 
                 # 二进制文件（PDF/Office等）—— 返回 binary，由 Tika 处理
-                elif ext in self.allowed_extensions or "application/pdf" in content_type or "application/octet-stream" in content_type:
+                else:
                     self.results.append({
                         "file_name": file_name,
                         "binary": content,
@@ -308,10 +674,28 @@ class WebCrawlerSource(BaseSource):
                         "user_metadata": self.user_metadata,
                         "score": 0.0
                     })
-                else:
-                    logger.debug(f"[WebCrawlerSource] Skipped content-type {content_type} for {url}")
+                return True
         except Exception as e:
-            logger.error(f"[WebCrawlerSource] Failed to fetch/process {url}: {e}")
+            logger.error("[WebCrawlerSource] Failed to fetch/process %s: %s", url, e)
+        return False
+
+    async def _read_body(self, resp: aiohttp.ClientResponse, url: str) -> Optional[bytearray]:
+        """
+        按块读取响应体到 bytearray；Content-Length 或实际大小超过 max_bytes 时放弃并返回 None。
+        """
+        length = resp.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > self.max_bytes:
+            logger.info("[WebCrawlerSource] Skipping %s: Content-Length %s exceeds %s", url, length, self.max_bytes)
+            resp.release()
+            return None
+
+        buf = bytearray()
+        async for chunk in resp.content.iter_chunked(RESPONSE_CHUNK_SIZE):
+            buf += chunk
+            if len(buf) > self.max_bytes:
+                logger.info("[WebCrawlerSource] Skipping %s: body exceeds %s bytes", url, self.max_bytes)
+                return None
+        return buf
 
     def _score_text(self, text: str, raw_bytes: bytes) -> float:
         """
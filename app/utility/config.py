@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 
@@ -37,6 +38,8 @@ class Settings(BaseSettings):
     TIKA_SERVICE_URL: Optional[str] = None
     TIKA_SERVICE_TIMEOUT: Optional[int] = 8000
     MAX_WEB_CRAWLER_CONCURRENCY: Optional[int] = 5
+    # True：网页正文用 trafilatura 精确抽取；False：用 resiliparse / selectolax 快速抽取
+    WEB_CRAWLER_FAVOR_PRECISION: Optional[bool] = False
     TESSERACT_PATH: Optional[str] = None
     LIBRE_OFFICE_PATH: Optional[str] = None
     POPPLER_PATH: Optional[str] = None
@@ -73,4 +76,14 @@ class Settings(BaseSettings):
         env_file = ".env"
         env_file_encoding = "utf-8"
 
-Config = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """进程内唯一的配置实例，首次调用时才读取环境变量 / .env 并做 pydantic 校验"""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # 兼容原有的 `from app.utility.config import Config`：首次访问 Config 时才创建 Settings
+    if name == "Config":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
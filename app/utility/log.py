@@ -3,18 +3,20 @@ import os
 import sys
 
 def get_logger():
-    log_dir = "/app/logs"
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    log_file = os.path.join(log_dir, 'llm-rag.log')
+    # 日志目录可通过环境变量 LOG_DIR 配置（默认 /app/logs，即容器内路径）
+    log_dir = os.getenv("LOG_DIR", "/app/logs")
+    handlers = [logging.StreamHandler(sys.stdout)]  # 强制日志输出到 stdout
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        handlers.append(logging.FileHandler(os.path.join(log_dir, 'llm-rag.log'), mode='a', encoding='utf-8'))
+    except OSError as e:
+        # 非容器环境下目录不可写时只输出到 stdout，而不是在 import 时崩溃
+        print(f"Log directory {log_dir} unavailable, logging to stdout only: {e}", file=sys.stderr)
 
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),  # 强制日志输出到 stdout
-            logging.FileHandler(log_file, mode='a', encoding='utf-8'),
-        ]
+        handlers=handlers,
     )
 
     app_logger = logging.getLogger("app")
@@ -1,4 +1,9 @@
 # app/worker/tasks.py
+import threading
+from typing import List, Optional, Tuple
+
+from celery.signals import worker_process_init
+
 from app.worker.celery_app import celery_app
 from app.orchestrator.pipeline_runner import PipelineRunner
 from app.sources.file_source import FileSource
@@ -9,6 +14,32 @@ from app.pipelines.llm_processor import LLMProcessor
 from app.pipelines.embed_processor import EmbedProcessor
 from app.sinks.solr_sink import SolrSink
 from app.sinks.chroma_sink import ChromaSink
+from app.pipelines.base import BaseProcessor
+from app.sinks.base import BaseSink
+
+# 处理器 / 无缓冲的 sink 在每个 worker 进程内只创建一次（可能加载模型、建立 HTTP 连接池），所有任务复用。
+# SolrSink 带批量缓冲区，每个任务单独创建（连接池是模块级共享的，创建开销很小），
+# 避免一个任务的 flush 发送、或因失败连累另一个任务的 doc
+_PROCESSORS: Optional[List[BaseProcessor]] = None
+_SINKS: Optional[List[BaseSink]] = None
+_pipeline_lock = threading.Lock()
+
+
+def _get_pipeline() -> Tuple[List[BaseProcessor], List[BaseSink]]:
+    global _PROCESSORS, _SINKS
+    if _PROCESSORS is None:
+        with _pipeline_lock:
+            if _PROCESSORS is None:
+                _SINKS = [ChromaSink()]
+                _PROCESSORS = [
+                    TikaProcessor.get_instance(),
+                    CleanProcessor(),
+                    ChunkProcessor(),
+                    LLMProcessor(),
+                    EmbedProcessor(),
+                ]
+    return _PROCESSORS, [SolrSink(), *_SINKS]
+
 
 # 如果 celery_app 是 None（没有 Redis），导出一个占位函数以避免导入错误
 if celery_app is None:
@@ -16,21 +47,24 @@ if celery_app is None:
         raise RuntimeError("Celery not configured. Set REDIS_BROKER to enable async mode.")
     ingest_file_task = ingest_file_task_placeholder
 else:
+    @worker_process_init.connect
+    def _init_worker_pipeline(**kwargs):
+        # prefork 子进程启动时预先初始化，第一个任务不必承担加载开销（solo/threads 池下由 _get_pipeline 懒加载）
+        _get_pipeline()
+
     @celery_app.task(bind=True, name="ingest_file_task")
     def ingest_file_task(self, filename: str, content: bytes):
         try:
+            processors, sinks = _get_pipeline()
             runner = PipelineRunner(
                 source=FileSource(filename, content),
-                processors=[
-                    TikaProcessor(),
-                    CleanProcessor(),
-                    ChunkProcessor(),
-                    LLMProcessor(),
-                    EmbedProcessor(),
-                ],
-                sinks=[SolrSink(), ChromaSink()]
+                processors=processors,
+                sinks=sinks
             )
             result = runner.run()
+            if result.get("status") == "failed":
+                # sink flush 失败时 runner 不抛异常、只在 summary 中标记，这里转成异常以触发重试
+                raise RuntimeError(result["files"][0].get("error") or "Pipeline failed")
             return {"status": "success", "meta": {"chunks": len(result.get("chunks", []))}}
         except Exception as e:
             # 自动重试机制
@@ -0,0 +1,48 @@
+# tests/test_web_crawler_robots.py
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from app.sources.web_crawler_source import WebCrawlerSource
+
+# 约 43KB 的 robots.txt，禁止规则放在最后，只有完整读取才能看到
+ROBOTS_BODY = ("User-agent: *\n" + "".join(f"Allow: /page-{i}\n" for i in range(3000))
+               + "Disallow: /private\n").encode()
+CHUNK = 4096
+
+
+async def _chunked_robots(request: web.Request) -> web.StreamResponse:
+    resp = web.StreamResponse(headers={"Content-Type": "text/plain"})
+    resp.enable_chunked_encoding()
+    await resp.prepare(request)
+    for i in range(0, len(ROBOTS_BODY), CHUNK):
+        await resp.write(ROBOTS_BODY[i:i + CHUNK])
+        await asyncio.sleep(0.01)  # 让每块分别到达客户端
+    await resp.write_eof()
+    return resp
+
+
+async def _check_robots():
+    app = web.Application()
+    app.router.add_get("/robots.txt", _chunked_robots)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+    try:
+        source = WebCrawlerSource(f"{base}/")
+        async with aiohttp.ClientSession() as session:
+            return (await source._is_disallowed_by_robots(f"{base}/private/doc", session),
+                    await source._is_disallowed_by_robots(f"{base}/page-1", session))
+    finally:
+        await runner.cleanup()
+
+
+def test_robots_read_across_chunks():
+    assert len(ROBOTS_BODY) > 10 * CHUNK
+    private_disallowed, page_disallowed = asyncio.run(_check_robots())
+    assert private_disallowed
+    assert not page_disallowed